@@ -3,14 +3,25 @@ import numpy as np
 import time
 import matplotlib.pyplot as plt
 import abc
+import multiprocessing
 import meep as mp
 
 from nanophotonic_structures import constants
 from nanophotonic_structures.utils import utils_materials
 from nanophotonic_structures.utils import utils_io
+from nanophotonic_structures.utils import utils_cache
+from nanophotonic_structures.utils import utils_rcwa
+from nanophotonic_structures.utils import utils_reconstruction
+from nanophotonic_structures.utils import utils_cost
+from nanophotonic_structures.utils import utils_manifest
+from nanophotonic_structures.utils import utils_store
+from nanophotonic_structures.utils import utils_geometry
 
 
 class BaseStructure(abc.ABC):
+    backends = ['fdtd']
+    mirror_directions = []
+
     def __init__(
         self,
         name, # a structure name
@@ -28,6 +39,21 @@ class BaseStructure(abc.ABC):
         time_step=2.0, # a time step
         path_outputs='../../outputs-nanophotonic-structures', # a path to save outputs
         path_properties='../../datasets-nanophotonic-structures', # a path to save properties
+        use_cache_empty=False, # a flag for reusing empty-cell simulations
+        path_cache_empty=None, # a path to store empty-cell simulations, None for memory only
+        backend='fdtd', # a solver backend, one of self.backends
+        order_fourier=constants.order_fourier_rcwa, # a Fourier order for the rcwa backend
+        num_slices=constants.num_slices_rcwa, # the number of staircase slices for the rcwa backend
+        use_symmetries=False, # a flag for applying mirror symmetries of a unit cell
+        use_cache_voxelization=False, # a flag for reusing results of identical voxelizations
+        num_frequencies_monitored=None, # the number of monitored frequencies, None for all frequencies
+        tolerance_reconstruction=constants.tolerance_reconstruction, # a tolerance of spectral reconstruction
+        stop_policy='fields', # a stop policy for the decay mode, fields or fluxes
+        tolerance_fluxes=constants.tolerance_stop_fluxes, # a tolerance of relative flux changes for the fluxes policy
+        run_concurrently=False, # a flag for running empty-cell and structured simulations in two processes
+        source='eigenmode', # a source type, eigenmode or planewave
+        format_properties='npy', # a format of saved properties, npy for a file per design or hdf5 for a store per experiment
+        size_buffer_store=1, # the number of results buffered before they are appended to a store, for the hdf5 format
     ):
         # 1 = 10 nm
         self.unit_length = constants.unit_length
@@ -44,6 +70,15 @@ class BaseStructure(abc.ABC):
         assert isinstance(save_properties, bool)
         assert isinstance(save_efields_hfields, bool)
         assert isinstance(wavelength, (int, tuple))
+        assert isinstance(use_cache_empty, bool)
+        assert isinstance(path_cache_empty, (type(None), str))
+        assert isinstance(backend, str)
+        assert isinstance(order_fourier, int)
+        assert isinstance(num_slices, int)
+        assert order_fourier >= 0
+        assert num_slices > 0
+        assert isinstance(use_symmetries, bool)
+        assert isinstance(use_cache_voxelization, bool)
         if isinstance(wavelength, tuple):
             assert len(wavelength) == 2
             assert isinstance(wavelength[0], int)
@@ -105,8 +140,73 @@ class BaseStructure(abc.ABC):
         self.path_outputs = path_outputs
         self.path_properties = path_properties
 
+        if use_cache_empty and mp.count_processors() > 1:
+            # ranks may disagree on disk entries written by other jobs, so that only memory is used.
+            path_cache_empty = None
+
+        self.use_cache_empty = use_cache_empty
+        self.cache_empty = utils_cache.get_cache(path_cache_empty) if use_cache_empty else None
+        self.entry_empty = None
+
+        # a structure supports a backend other than fdtd only if it defines its spectra for that backend.
+        methods_backends = {'tmm': 'compute_spectra_tmm', 'rcwa': 'get_layers_rcwa'}
+        if backend not in self.backends or (backend in methods_backends and not hasattr(self, methods_backends[backend])):
+            raise ValueError(f'{backend} is not a backend of {type(self).__name__}, which supports {self.backends}')
+
+        self.backend = backend
+        self.order_fourier = order_fourier
+        self.num_slices = num_slices
+
+        self.use_symmetries = use_symmetries
+        self.apply_symmetries = True
+
+        self.extra_materials = []
+
+        assert not (use_cache_voxelization and mp.count_processors() > 1)
+        self.use_cache_voxelization = use_cache_voxelization
+        self.hash_voxelization = None
+
+        assert isinstance(num_frequencies_monitored, (type(None), int))
+        assert isinstance(tolerance_reconstruction, float)
+        assert num_frequencies_monitored is None or num_frequencies_monitored >= 4
+        assert tolerance_reconstruction > 0
+
+        self.num_frequencies_monitored = num_frequencies_monitored
+        self.tolerance_reconstruction = tolerance_reconstruction
+        self.error_reconstruction = None
+
+        assert stop_policy in ['fields', 'fluxes']
+        assert isinstance(tolerance_fluxes, float)
+        assert tolerance_fluxes > 0
+
+        self.stop_policy = stop_policy
+        self.tolerance_fluxes = tolerance_fluxes
+        self.time_steps_empty = None
+        self.time_steps = None
+
+        assert isinstance(run_concurrently, bool)
+        self.run_concurrently = run_concurrently
+
+        assert source in ['eigenmode', 'planewave']
+        self.source = source
+
+        # voxelization indices point to files of single designs, so that they require the npy format.
+        assert format_properties in ['npy', 'hdf5']
+        assert not (use_cache_voxelization and format_properties == 'hdf5')
+        self.format_properties = format_properties
+
+        # buffered results are lost if a process dies, so that callers with a larger buffer call flush_store at the end.
+        assert isinstance(size_buffer_store, int)
+        assert size_buffer_store > 0
+        self.size_buffer_store = size_buffer_store
+        self.buffer_store = []
+
+    def print_master(self, *args, **kwargs):
+        if mp.am_master():
+            print(*args, **kwargs)
+
     def print_separators(self):
-        print('=' * 80, flush=True)
+        self.print_master('=' * 80, flush=True)
 
     def get_frequency_info(self):
         if isinstance(self.wavelength, (float, int)):
@@ -129,6 +229,43 @@ class BaseStructure(abc.ABC):
 
         return f_cen, d_f, num_f
 
+    def get_frequencies(self):
+        f_cen, d_f, num_f = self.get_frequency_info()
+
+        if num_f == 1:
+            frequencies = np.array([f_cen])
+        else:
+            frequencies = np.linspace(f_cen - 0.5 * d_f, f_cen + 0.5 * d_f, num_f)
+
+        return frequencies
+
+    def get_num_frequencies_monitored(self):
+        _, _, num_f = self.get_frequency_info()
+
+        if self.num_frequencies_monitored is None or num_f == 1:
+            return num_f
+        else:
+            return min(self.num_frequencies_monitored, num_f)
+
+    def reconstruct_fluxes(self, freq_refl, fluxes_tran_empty, fluxes_refl, fluxes_tran):
+        frequencies_monitored = np.array(freq_refl)
+        frequencies = self.get_frequencies()
+
+        list_fluxes = []
+        errors = []
+
+        for fluxes in [fluxes_tran_empty, fluxes_refl, fluxes_tran]:
+            fluxes, error = utils_reconstruction.reconstruct(
+                frequencies_monitored, np.array(fluxes), frequencies, self.tolerance_reconstruction)
+
+            list_fluxes.append(fluxes.tolist())
+            errors.append(error)
+
+        self.error_reconstruction = float(np.max(errors))
+        self.print_master(f'spectra reconstructed from {frequencies_monitored.shape[0]} frequencies with error {self.error_reconstruction:.4e}', flush=True)
+
+        return [frequencies.tolist()] + list_fluxes
+
     def verify_general(self, variables):
         assert isinstance(self.size_cell, list)
         assert len(self.size_cell) == 3
@@ -141,6 +278,56 @@ class BaseStructure(abc.ABC):
         self.verify_general(variables)
         self.verify_specific(variables)
 
+    def is_feasible(self, X):
+        # X: (num_designs, num_variables) of untransformed variables, without creating any meep object
+        X = np.asarray(X)
+        assert len(X.shape) == 2
+        assert X.shape[1] == self.num_variables
+
+        size_cell = self.size_cell
+
+        # parse, change_size_cell, and get_limit_y are elementwise, so that variables along columns are vectorized.
+        variables = self.transform(X.astype(np.float64)).T
+        self.change_size_cell(variables)
+        constraints = self.get_constraints(variables)
+
+        self.size_cell = size_cell
+
+        if len(constraints) == 0:
+            return np.ones(X.shape[0], dtype=bool)
+
+        constraints = np.broadcast_arrays(*[np.asarray(constraint) for constraint in constraints], np.ones(X.shape[0], dtype=bool))
+
+        return np.all(np.array(constraints), axis=0)
+
+    def get_parity(self):
+        # a source is Ez-polarized, so that Ez is odd under the mirror along Z.
+        # meep has no parity along X, and the mirror along X with a phase of +1 in get_symmetries carries that symmetry.
+        parity = mp.NO_PARITY
+
+        if self.use_symmetries:
+            for direction in self.mirror_directions:
+                if direction == mp.Z:
+                    parity += mp.ODD_Z
+                elif direction != mp.X:
+                    raise ValueError
+
+        return parity
+
+    def get_symmetries(self):
+        symmetries = []
+
+        if self.use_symmetries and self.apply_symmetries:
+            for direction in self.mirror_directions:
+                if direction == mp.X:
+                    symmetries.append(mp.Mirror(direction=mp.X, phase=1))
+                elif direction == mp.Z:
+                    symmetries.append(mp.Mirror(direction=mp.Z, phase=-1))
+                else:
+                    raise ValueError
+
+        return symmetries
+
     def define_cell(self):
         self.cell = mp.Vector3(*self.size_cell)
 
@@ -153,18 +340,40 @@ class BaseStructure(abc.ABC):
     def define_sources(self):
         f_cen, d_f, _ = self.get_frequency_info()
 
-        self.sources = [
-            mp.EigenModeSource(
-                mp.GaussianSource(
-                    frequency=f_cen,
-                    fwidth=d_f,
-                    is_integrated=True
-                ),
-                direction=mp.Y,
-                size=mp.Vector3(self.size_cell[0], 0, 0),
-                center=mp.Vector3(0, -0.5 * (self.size_cell[1] - 2 * self.depth_pml), 0),
-            )
-        ]
+        if self.source == 'eigenmode':
+            self.sources = [
+                mp.EigenModeSource(
+                    mp.GaussianSource(
+                        frequency=f_cen,
+                        fwidth=d_f,
+                        is_integrated=True
+                    ),
+                    direction=mp.Y,
+                    size=mp.Vector3(self.size_cell[0], 0, 0),
+                    center=mp.Vector3(0, -0.5 * (self.size_cell[1] - 2 * self.depth_pml), 0),
+                    eig_parity=self.get_parity(),
+                )
+            ]
+        elif self.source == 'planewave':
+            # a normally incident mode in air is a plane wave, so that no eigenmode solve is needed.
+            # a current sheet of amplitude K radiates |K|^2 / 4 per unit area along +y, which is normalized to unit power.
+            area = self.size_cell[0] * (self.size_cell[2] if self.size_cell[2] > 0 else 1)
+
+            self.sources = [
+                mp.Source(
+                    mp.GaussianSource(
+                        frequency=f_cen,
+                        fwidth=d_f,
+                        is_integrated=True
+                    ),
+                    component=mp.Ez,
+                    size=mp.Vector3(self.size_cell[0], 0, self.size_cell[2]),
+                    center=mp.Vector3(0, -0.5 * (self.size_cell[1] - 2 * self.depth_pml), 0),
+                    amplitude=2.0 / np.sqrt(area),
+                )
+            ]
+        else:
+            raise ValueError
 
     def define_materials(self):
         materials = []
@@ -187,18 +396,64 @@ class BaseStructure(abc.ABC):
             direction=mp.Y,
         )
 
+    def get_key_empty(self):
+        f_cen, d_f, _ = self.get_frequency_info()
+        num_f = self.get_num_frequencies_monitored()
+
+        key_empty = utils_cache.get_key([
+            self.mode,
+            self.size_cell,
+            self.depth_pml,
+            self.resolution,
+            f_cen,
+            d_f,
+            num_f,
+            self.eps_averaging,
+            self.steps_for_decay,
+            self.decay_by,
+            self.stop_policy,
+            self.tolerance_fluxes,
+            self.source,
+            self.get_parity(),
+            len(self.get_symmetries()),
+        ])
+
+        return key_empty
+
+    def load_empty(self):
+        if self.cache_empty is None:
+            return None
+
+        return self.cache_empty.get(self.get_key_empty())
+
+    def save_empty(self, refl_empty_data, fluxes_tran_empty):
+        if self.cache_empty is None:
+            return
+
+        entry_empty = {
+            'flux_data_E': np.array(refl_empty_data.E),
+            'flux_data_H': np.array(refl_empty_data.H),
+            'fluxes_tran_empty': np.array(fluxes_tran_empty),
+        }
+
+        self.cache_empty.put(self.get_key_empty(), entry_empty)
+
     def define_simulations(self, variables):
         str_current_experiment = self.get_str_current_experiment_with_variables(variables)
 
-        self.sim_empty = mp.Simulation(
-            cell_size=self.cell,
-            boundary_layers=self.pml,
-            sources=self.sources,
-            resolution=self.resolution,
-            k_point=mp.Vector3(),
-            eps_averaging=self.eps_averaging,
-            filename_prefix=f'{str_current_experiment}_empty',
-        )
+        if self.entry_empty is None:
+            self.sim_empty = mp.Simulation(
+                cell_size=self.cell,
+                boundary_layers=self.pml,
+                sources=self.sources,
+                resolution=self.resolution,
+                k_point=mp.Vector3(),
+                eps_averaging=self.eps_averaging,
+                symmetries=self.get_symmetries(),
+                filename_prefix=f'{str_current_experiment}_empty',
+            )
+        else:
+            self.sim_empty = None
 
         self.sim = mp.Simulation(
             cell_size=self.cell,
@@ -208,17 +463,21 @@ class BaseStructure(abc.ABC):
             resolution=self.resolution,
             k_point=mp.Vector3(),
             eps_averaging=self.eps_averaging,
+            symmetries=self.get_symmetries(),
+            extra_materials=self.extra_materials,
             filename_prefix=f'{str_current_experiment}',
         )
 
     def add_fluxes(self):
-        f_cen, d_f, num_f = self.get_frequency_info()
+        f_cen, d_f, _ = self.get_frequency_info()
+        num_f = self.get_num_frequencies_monitored()
 
         if isinstance(self.wavelength, (float, int)):
             d_f = 0
 
-        self.refl_empty = self.sim_empty.add_flux(f_cen, d_f, num_f, self.monitor_reflection)
-        self.tran_empty = self.sim_empty.add_flux(f_cen, d_f, num_f, self.monitor_transmision)
+        if self.sim_empty is not None:
+            self.refl_empty = self.sim_empty.add_flux(f_cen, d_f, num_f, self.monitor_reflection)
+            self.tran_empty = self.sim_empty.add_flux(f_cen, d_f, num_f, self.monitor_transmision)
 
         self.refl = self.sim.add_flux(f_cen, d_f, num_f, self.monitor_reflection)
         self.tran = self.sim.add_flux(f_cen, d_f, num_f, self.monitor_transmision)
@@ -234,6 +493,7 @@ class BaseStructure(abc.ABC):
         self.define_materials()
         self.define_monitors()
         self.define_geometries(variables)
+        self.entry_empty = self.load_empty()
         self.define_simulations(variables)
         self.add_fluxes()
 
@@ -289,29 +549,65 @@ class BaseStructure(abc.ABC):
             'fluxes_tran': fluxes_tran,
         }
 
-        print('', flush=True)
+        self.print_master('', flush=True)
         self.print_separators()
-        print(f'num_wavelengths {num_wavelengths}', flush=True)
-        print(f'mean(wavelengths) {np.mean(wavelengths)}', flush=True)
-        print(f'min(wavelengths) {np.min(wavelengths)}', flush=True)
-        print(f'max(wavelengths) {np.max(wavelengths)}', flush=True)
-        print(f'mean(fluxes_tran_emtpy) {np.mean(fluxes_tran_empty)}', flush=True)
-        print(f'mean(fluxes_refl) {np.mean(fluxes_refl)}', flush=True)
-        print(f'mean(fluxes_tran) {np.mean(fluxes_tran)}', flush=True)
-        print('')
-
-        print(f'mean(transmittance) {np.mean(transmittance)}', flush=True)
-        print(f'mean(reflectance) {np.mean(reflectance)}', flush=True)
-        print(f'mean(absorbance) {np.mean(absorbance)}', flush=True)
+        self.print_master(f'num_wavelengths {num_wavelengths}', flush=True)
+        self.print_master(f'mean(wavelengths) {np.mean(wavelengths)}', flush=True)
+        self.print_master(f'min(wavelengths) {np.min(wavelengths)}', flush=True)
+        self.print_master(f'max(wavelengths) {np.max(wavelengths)}', flush=True)
+        self.print_master(f'mean(fluxes_tran_emtpy) {np.mean(fluxes_tran_empty)}', flush=True)
+        self.print_master(f'mean(fluxes_refl) {np.mean(fluxes_refl)}', flush=True)
+        self.print_master(f'mean(fluxes_tran) {np.mean(fluxes_tran)}', flush=True)
+        self.print_master('')
+
+        self.print_master(f'mean(transmittance) {np.mean(transmittance)}', flush=True)
+        self.print_master(f'mean(reflectance) {np.mean(reflectance)}', flush=True)
+        self.print_master(f'mean(absorbance) {np.mean(absorbance)}', flush=True)
         self.print_separators()
-        print('', flush=True)
+        self.print_master('', flush=True)
 
         return dict_all
 
+    def stop_when_fluxes_converged(self, monitors):
+        # it stops when accumulated fluxes change less than self.tolerance_fluxes over self.steps_for_decay.
+        state = {
+            'time_next': None,
+            'fluxes': None,
+        }
+
+        def _stop(sim):
+            if state['time_next'] is not None and sim.round_time() < state['time_next']:
+                return False
+
+            state['time_next'] = sim.round_time() + self.steps_for_decay
+
+            fluxes = np.concatenate([np.array(mp.get_fluxes(monitor)) for monitor in monitors])
+            fluxes_previous = state['fluxes']
+            state['fluxes'] = fluxes
+
+            if fluxes_previous is None:
+                return False
+
+            change = np.linalg.norm(fluxes - fluxes_previous) / max(np.linalg.norm(fluxes), np.finfo(float).tiny)
+
+            self.print_master(f'relative change of fluxes {change:.4e} at time {sim.round_time()}', flush=True)
+
+            return change < self.tolerance_fluxes
+
+        return _stop
+
+    def get_stop_condition(self, monitors):
+        if self.stop_policy == 'fields':
+            return mp.stop_when_fields_decayed(self.steps_for_decay, mp.Ez, self.point_to_measure, self.decay_by)
+        elif self.stop_policy == 'fluxes':
+            return self.stop_when_fluxes_converged(monitors)
+        else:
+            raise ValueError
+
     def run_simulation_empty(self):
         if self.mode == 'decay':
             self.sim_empty.run(
-                until_after_sources=mp.stop_when_fields_decayed(self.steps_for_decay, mp.Ez, self.point_to_measure, self.decay_by),
+                until_after_sources=self.get_stop_condition([self.refl_empty, self.tran_empty]),
             )
         elif self.mode == 'fixed':
             self.sim_empty.run(until=2.0)
@@ -326,10 +622,10 @@ class BaseStructure(abc.ABC):
                     self.get_str_current_experiment()
                 )
 
-                if not os.path.exists(self.path_outputs):
+                if mp.am_master() and not os.path.exists(self.path_outputs):
                     os.mkdir(self.path_outputs)
 
-                if not os.path.exists(path_intermediate):
+                if mp.am_master() and not os.path.exists(path_intermediate):
                     os.mkdir(path_intermediate)
 
                 self.sim.use_output_directory(os.path.join(
@@ -341,13 +637,11 @@ class BaseStructure(abc.ABC):
                     mp.at_beginning(mp.output_epsilon),
                     mp.to_appended("ez", mp.at_every(self.time_step, mp.output_efield_z)),
                     mp.to_appended("hz", mp.at_every(self.time_step, mp.output_hfield_z)),
-                    until_after_sources=mp.stop_when_fields_decayed(
-                        self.steps_for_decay, mp.Ez, self.point_to_measure, self.decay_by),
+                    until_after_sources=self.get_stop_condition([self.refl, self.tran]),
                 )
             else:
                 self.sim.run(
-                    until_after_sources=mp.stop_when_fields_decayed(
-                        self.steps_for_decay, mp.Ez, self.point_to_measure, self.decay_by),
+                    until_after_sources=self.get_stop_condition([self.refl, self.tran]),
                 )
         elif self.mode == 'fixed':
             self.sim.run(until=2.0)
@@ -355,7 +649,11 @@ class BaseStructure(abc.ABC):
             raise ValueError
 
     def reset(self):
-        self.sim_empty.reset_meep()
+        if self.backend != 'fdtd':
+            return
+
+        if self.sim_empty is not None:
+            self.sim_empty.reset_meep()
         self.sim.reset_meep()
 
     def get_limit_y(self):
@@ -365,25 +663,29 @@ class BaseStructure(abc.ABC):
         return limit_y_positive, limit_y_negative
 
     def plot_2D(self, plot_sources=True, plot_monitors=True):
+        if self.backend != 'fdtd':
+            return
+
         if self.show_figures or self.save_figures:
             str_structure_empty, str_structure, str_efield_z, str_hfield_z = utils_io.get_str_figures(
                 self.name)
 
-            self.sim_empty.plot2D(
-                plot_sources_flag=plot_sources,
-                plot_monitors_flag=plot_monitors,
-            )
-            self.set_axis()
-            if self.save_figures: plt.savefig(str_structure_empty)
-            if self.show_figures: plt.show()
+            if self.sim_empty is not None:
+                self.sim_empty.plot2D(
+                    plot_sources_flag=plot_sources,
+                    plot_monitors_flag=plot_monitors,
+                )
+                self.set_axis()
+                if self.save_figures and mp.am_master(): plt.savefig(str_structure_empty)
+                if self.show_figures and mp.am_master(): plt.show()
 
             self.sim.plot2D(
                 plot_sources_flag=plot_sources,
                 plot_monitors_flag=plot_monitors,
             )
             self.set_axis()
-            if self.save_figures: plt.savefig(str_structure)
-            if self.show_figures: plt.show()
+            if self.save_figures and mp.am_master(): plt.savefig(str_structure)
+            if self.show_figures and mp.am_master(): plt.show()
 
             self.sim.plot2D(
                 fields=mp.Ez,
@@ -391,8 +693,8 @@ class BaseStructure(abc.ABC):
                 plot_monitors_flag=plot_monitors,
             )
             self.set_axis()
-            if self.save_figures: plt.savefig(str_efield_z)
-            if self.show_figures: plt.show()
+            if self.save_figures and mp.am_master(): plt.savefig(str_efield_z)
+            if self.show_figures and mp.am_master(): plt.show()
 
             self.sim.plot2D(
                 fields=mp.Hz,
@@ -400,10 +702,13 @@ class BaseStructure(abc.ABC):
                 plot_monitors_flag=plot_monitors,
             )
             self.set_axis()
-            if self.save_figures: plt.savefig(str_hfield_z)
-            if self.show_figures: plt.show()
+            if self.save_figures and mp.am_master(): plt.savefig(str_hfield_z)
+            if self.show_figures and mp.am_master(): plt.show()
 
     def plot_3D(self, epsilons_empty, epsilons):
+        if self.backend != 'fdtd':
+            return
+
         if self.show_figures or self.save_figures:
             str_structure_empty, str_structure, str_efield_z, str_hfield_z = utils_io.get_str_figures(
                 self.name)
@@ -429,6 +734,68 @@ class BaseStructure(abc.ABC):
         ax.xaxis.label.set_visible(False)
         ax.yaxis.label.set_visible(False)
 
+    def get_features_cost(self, variables):
+        # features of a runtime model, for untransformed variables of (num_variables, ) or (num_designs, num_variables)
+        variables = np.asarray(variables)
+        X = np.atleast_2d(variables)
+        assert len(X.shape) == 2
+        assert X.shape[1] == self.num_variables
+
+        size_cell = self.size_cell
+
+        # change_size_cell is elementwise, so that variables along columns are vectorized, as in is_feasible.
+        self.change_size_cell(self.transform(X.astype(np.float64)).T)
+        sizes = [np.broadcast_to(np.asarray(size, dtype=float), (X.shape[0], )) for size in self.size_cell]
+
+        self.size_cell = size_cell
+
+        num_voxels = np.prod([size * self.resolution for size in sizes if np.all(size > 0)], axis=0)
+        # the number of time steps scales with the extent along the propagation direction.
+        num_steps = sizes[1] * self.resolution
+        num_poles = np.sum([
+            len(utils_materials.get_material(str_material).E_susceptibilities) for str_material in self.list_materials
+        ])
+        num_frequencies = self.get_num_frequencies_monitored()
+
+        features = np.stack([
+            num_voxels,
+            num_steps,
+            np.full(X.shape[0], 1 + num_poles, dtype=float),
+            np.full(X.shape[0], num_frequencies, dtype=float),
+        ], axis=1)
+
+        if len(variables.shape) == 1:
+            return features[0]
+        else:
+            return features
+
+    def get_features_memory(self, variables):
+        # bytes of fields, polarizations, and DFT fields of both simulations, for untransformed variables
+        size_cell_original = self.size_cell
+
+        # the cell size of a design is restored afterward, as in get_features_cost, so that it does not leak into other designs.
+        self.change_size_cell(self.transform(variables))
+        size_cell = self.size_cell
+
+        self.size_cell = size_cell_original
+
+        is_3d = size_cell[2] > 0
+        num_voxels = np.prod([size * self.resolution for size in size_cell if size > 0])
+        num_components = 6 if is_3d else 3
+        num_poles = np.sum([
+            len(utils_materials.get_material(str_material).E_susceptibilities) for str_material in self.list_materials
+        ])
+
+        # E, H, D, and B are stored in double precision for both simulations.
+        bytes_fields = 2 * 4 * 8 * num_voxels * num_components
+        # each pole stores current and previous polarizations for electric components.
+        bytes_susceptibilities = 2 * 8 * num_voxels * num_poles * num_components // 2
+        # two monitors per simulation store complex tangential fields for every frequency.
+        num_pixels_monitor = size_cell[0] * self.resolution
+        bytes_dft = 2 * 2 * 16 * num_pixels_monitor * (4 if is_3d else 2) * self.get_num_frequencies_monitored()
+
+        return np.array([bytes_fields, bytes_susceptibilities, bytes_dft], dtype=float)
+
     def get_str_current_experiment(self):
         str_current_experiment =  f'{self.name}_{"_".join(self.list_materials)}_{self.size_mesh}'
         return str_current_experiment
@@ -450,7 +817,53 @@ class BaseStructure(abc.ABC):
         str_file = f'{str_current_experiment}.npy'
         return str_file
 
+    def get_manifest(self):
+        return utils_manifest.Manifest(self.path_properties)
+
+    def is_completed(self, X):
+        # X: (num_designs, num_variables) of untransformed variables, checked with a single manifest query
+        X = np.asarray(X)
+        assert len(X.shape) == 2
+
+        str_current_experiment = self.get_str_current_experiment()
+        path_current = self.get_path_current()
+
+        if not os.path.exists(os.path.join(self.path_properties, utils_manifest.str_file_manifest)) and not os.path.exists(path_current) and len(self.buffer_store) == 0:
+            return np.zeros(X.shape[0], dtype=bool)
+
+        manifest = self.get_manifest()
+
+        # results saved before the manifest existed are indexed once per experiment, even if other jobs have saved results since.
+        if not manifest.is_rebuilt(str_current_experiment):
+            manifest.rebuild(str_current_experiment, self.name, self.list_materials, self.size_mesh, path_current, skip_if_rebuilt=True)
+
+        list_str_files = [self.get_str_file(self.transform(variables)) for variables in X]
+        str_files_buffered = [self.get_str_file(dict_properties['variables']) for dict_properties in self.buffer_store]
+
+        return manifest.contains(str_current_experiment, list_str_files) | np.isin(list_str_files, str_files_buffered)
+
+    def get_path_store(self):
+        path_store = os.path.join(
+            self.path_properties,
+            f'{self.get_str_current_experiment()}.h5'
+        )
+
+        return path_store
+
+    def get_store(self):
+        return utils_store.ResultStore(self.get_path_store())
+
     def save(self, dict_properties):
+        if not mp.am_master():
+            return
+
+        if self.format_properties == 'hdf5':
+            self.buffer_store.append(dict_properties)
+
+            if len(self.buffer_store) >= self.size_buffer_store:
+                self.flush_store()
+            return
+
         if not os.path.exists(self.path_properties):
             os.mkdir(self.path_properties)
 
@@ -461,26 +874,184 @@ class BaseStructure(abc.ABC):
             os.mkdir(path_current)
 
         path_file = os.path.join(path_current, str_file)
-        print(f'saved at {path_file}')
-        np.save(path_file, dict_properties)
+        path_temporary = f'{path_file}.{os.getpid()}.tmp'
+
+        # a result is renamed into place before it is indexed, so that the manifest never lists partial files.
+        with open(path_temporary, 'wb') as file_properties:
+            np.save(file_properties, dict_properties)
+        os.replace(path_temporary, path_file)
+        self.print_master(f'saved at {path_file}')
+
+        self.get_manifest().add(
+            self.get_str_current_experiment(),
+            self.name,
+            self.list_materials,
+            self.size_mesh,
+            [dict_properties['variables']],
+            [str_file],
+        )
+
+        if 'hash_voxelization' in dict_properties:
+            self.save_voxelization(dict_properties['hash_voxelization'], str_file)
+
+    def flush_store(self):
+        if len(self.buffer_store) == 0:
+            return
+
+        self.save_store(self.buffer_store)
+        self.buffer_store = []
+
+    def save_store(self, list_dict_properties):
+        if not mp.am_master():
+            return
+
+        if not os.path.exists(self.path_properties):
+            os.makedirs(self.path_properties, exist_ok=True)
+
+        str_current_experiment = self.get_str_current_experiment()
+
+        # the last result of a design in a batch is kept, and designs indexed already are not appended again,
+        # so that reruns do not add duplicate rows to a store.
+        dict_by_str_file = {}
+        for dict_properties in list_dict_properties:
+            dict_by_str_file[self.get_str_file(dict_properties['variables'])] = dict_properties
+
+        list_str_files = list(dict_by_str_file.keys())
+        is_saved = self.get_manifest().contains(str_current_experiment, list_str_files)
+        list_str_files = [str_file for str_file, is_saved_ in zip(list_str_files, is_saved) if not is_saved_]
+        list_dict_properties = [dict_by_str_file[str_file] for str_file in list_str_files]
+
+        if len(list_dict_properties) == 0:
+            return
+
+        # results are appended as rows, and they are indexed by the names of their npy counterparts.
+        self.get_store().append(list_dict_properties)
+        self.print_master(f'saved {len(list_dict_properties)} results at {self.get_path_store()}')
+
+        self.get_manifest().add(
+            str_current_experiment,
+            self.name,
+            self.list_materials,
+            self.size_mesh,
+            [dict_properties['variables'] for dict_properties in list_dict_properties],
+            list_str_files,
+            format_properties='hdf5',
+        )
+
+    def get_path_voxelizations(self):
+        path_voxelizations = os.path.join(
+            self.path_properties,
+            f'{self.get_str_current_experiment()}_voxelizations'
+        )
+
+        return path_voxelizations
+
+    def get_hash_voxelization(self):
+        f_cen, d_f, _ = self.get_frequency_info()
+        num_f = self.get_num_frequencies_monitored()
+
+        # materials are labeled by their names, so that labels do not depend on the order of list_materials.
+        names_materials = sorted(set(list(self.list_materials) + ['air']))
+        labels_materials = {
+            id(material): names_materials.index(name)
+            for name, material in zip(self.list_materials, self.materials)
+        }
+
+        # subpixels stand for the averaging of interfaces, so that designs that differ within a voxel hash apart.
+        num_subpixels = constants.num_subpixels_voxelization if self.eps_averaging else 1
+        num_voxels = [int(np.round(size * self.resolution)) for size in self.size_cell]
+
+        slabs = utils_geometry.rasterize(
+            self.geometries,
+            labels_materials,
+            names_materials.index('air'),
+            self.size_cell,
+            self.resolution,
+            num_subpixels=num_subpixels,
+        )
+
+        hash_voxelization = utils_cache.get_key_with_arrays([
+            self.name,
+            self.list_materials,
+            self.mode,
+            self.size_mesh,
+            self.depth_pml,
+            num_voxels,
+            num_subpixels,
+            f_cen,
+            d_f,
+            num_f,
+            self.tolerance_reconstruction,
+            self.eps_averaging,
+            self.steps_for_decay,
+            self.decay_by,
+            self.stop_policy,
+            self.tolerance_fluxes,
+            self.source,
+            self.get_parity(),
+            len(self.get_symmetries()),
+        ], slabs)
+
+        return hash_voxelization
+
+    def load_voxelization(self, variables_original, variables):
+        self.hash_voxelization = self.get_hash_voxelization()
+        path_index = os.path.join(self.get_path_voxelizations(), f'{self.hash_voxelization}.txt')
+
+        if not os.path.exists(path_index):
+            return None
+
+        with open(path_index, 'r') as file_index:
+            str_file_source = file_index.readline().strip()
+
+        path_source = os.path.join(self.get_path_current(), str_file_source)
+
+        if not os.path.exists(path_source):
+            return None
+
+        dict_all = np.load(path_source, allow_pickle=True)
+        dict_all = dict(dict_all[()])
+
+        dict_all['variables_original'] = variables_original
+        dict_all['variables'] = variables
+        dict_all['hash_voxelization'] = self.hash_voxelization
+        dict_all['reused_from'] = str_file_source
+
+        # measurements of the source are not those of this run, so that the cost model is not fitted to copies.
+        for key in ['memory_peak', 'time_steps', 'time_steps_empty']:
+            dict_all.pop(key, None)
+
+        self.print_master(f'identical voxelization found at {path_source}', flush=True)
+
+        return dict_all
+
+    def save_voxelization(self, hash_voxelization, str_file):
+        path_voxelizations = self.get_path_voxelizations()
+
+        if not os.path.exists(path_voxelizations):
+            os.makedirs(path_voxelizations, exist_ok=True)
+
+        # the first line is a source result, and the following lines are results reusing it.
+        with open(os.path.join(path_voxelizations, f'{hash_voxelization}.txt'), 'a') as file_index:
+            file_index.write(f'{str_file}\n')
 
     def print_experiment_info(self, variables):
         variables_parsed = self.parse(variables)
 
-        print('', flush=True)
+        self.print_master('', flush=True)
         self.print_separators()
-        print(f'unit_length {self.unit_length}')
-        print(f'size_mesh {self.size_mesh}')
-        print(f'resolution {self.resolution}')
-        print(f'size_cell_x {self.size_cell[0]} size_cell_y {self.size_cell[1]} size_cell_z {self.size_cell[2]}', flush=True)
-        print('', flush=True)
-
-        print(f'wavelength {self.wavelength}')
-        print(f'depth_pml {self.depth_pml}')
+        self.print_master(f'unit_length {self.unit_length}')
+        self.print_master(f'size_mesh {self.size_mesh}')
+        self.print_master(f'resolution {self.resolution}')
+        self.print_master(f'size_cell_x {self.size_cell[0]} size_cell_y {self.size_cell[1]} size_cell_z {self.size_cell[2]}', flush=True)
+        self.print_master('', flush=True)
+
+        self.print_master(f'wavelength {self.wavelength}')
+        self.print_master(f'depth_pml {self.depth_pml}')
         for label, variable in zip(self.labels, variables_parsed):
-            print(f'{label} {variable}')
+            self.print_master(f'{label} {variable}')
         self.print_separators()
-        print('', flush=True)
+        self.print_master('', flush=True)
 
     def transform(self, variable_or_variables):
         assert isinstance(variable_or_variables, (int, float, np.ndarray))
@@ -490,32 +1061,214 @@ class BaseStructure(abc.ABC):
 
         return variable_or_variables / self.unit_length
 
-    def _run(self, variables):
-        time_start = time.time()
-        variables_original = variables
-        variables = self.transform(variables)
+    def get_permittivities(self, frequencies):
+        permittivities = {}
 
-        self.change_size_cell(variables)
-        self.print_experiment_info(variables)
-        self.define_experiment(variables)
+        for str_material in self.list_materials + ['air']:
+            if str_material not in permittivities:
+                permittivities[str_material] = utils_materials.compute_permittivities(str_material, frequencies)
 
+        return permittivities
+
+    def compute_spectra_rcwa(self, variables, frequencies):
+        # get_layers_rcwa of a structure returns a period and a list of
+        # (thickness, permittivities_background, segments, permittivities_segments) from the source side to the other side
+        permittivities = self.get_permittivities(frequencies)
+
+        transmittance = []
+        reflectance = []
+
+        for variables_ in variables:
+            period, layers = self.get_layers_rcwa(variables_, permittivities)
+
+            transmittance_, reflectance_ = utils_rcwa.compute_transmittance_reflectance(
+                frequencies, period, layers, self.order_fourier)
+
+            transmittance.append(transmittance_)
+            reflectance.append(reflectance_)
+
+        return np.array(transmittance), np.array(reflectance)
+
+    def compute_fluxes_backend(self, variables):
+        # variables: (num_designs, num_variables), transformed
+        # returns freq_refl (num_frequencies, ), fluxes_tran_empty (num_frequencies, ),
+        # fluxes_refl (num_designs, num_frequencies), and fluxes_tran (num_designs, num_frequencies)
+        assert len(variables.shape) == 2
+
+        frequencies = self.get_frequencies()
+
+        if self.backend == 'tmm':
+            transmittance, reflectance = self.compute_spectra_tmm(variables, frequencies)
+        elif self.backend == 'rcwa':
+            transmittance, reflectance = self.compute_spectra_rcwa(variables, frequencies)
+        else:
+            raise ValueError
+
+        # fluxes are normalized by incident fluxes, and reflected fluxes follow the sign convention of meep.
+        fluxes_tran_empty = np.ones(frequencies.shape[0])
+        fluxes_refl = -1.0 * reflectance
+        fluxes_tran = transmittance
+
+        return frequencies, fluxes_tran_empty, fluxes_refl, fluxes_tran
+
+    def run_simulation_empty_in_process(self, connection):
         self.run_simulation_empty()
 
         refl_empty_data = self.sim_empty.get_flux_data(self.refl_empty)
-        fluxes_tran_empty = mp.get_fluxes(self.tran_empty)
 
-        self.sim.load_minus_flux_data(self.refl, refl_empty_data)
+        connection.send({
+            'flux_data_E': np.array(refl_empty_data.E),
+            'flux_data_H': np.array(refl_empty_data.H),
+            'fluxes_tran_empty': np.array(mp.get_fluxes(self.tran_empty)),
+            'epsilons_empty': self.sim_empty.get_epsilon(),
+            'time_steps_empty': self.sim_empty.timestep(),
+        })
+        connection.close()
+
+    def run_simulations_concurrently(self):
+        # meep objects cannot be pickled, so that a forked process runs the empty-cell simulation.
+        assert mp.count_processors() == 1
+
+        context = multiprocessing.get_context('fork')
+        connection_parent, connection_child = context.Pipe(duplex=False)
+
+        process = context.Process(target=self.run_simulation_empty_in_process, args=(connection_child, ))
+        process.start()
+        connection_child.close()
 
         self.run_simulation()
 
-        epsilons_empty = self.sim_empty.get_epsilon()
+        try:
+            entry_empty = connection_parent.recv()
+        except EOFError:
+            raise RuntimeError('empty-cell simulation failed')
+        finally:
+            process.join()
+            connection_parent.close()
+
+        refl_empty_data = mp.FluxData(E=entry_empty['flux_data_E'], H=entry_empty['flux_data_H'])
+        refl_data = self.sim.get_flux_data(self.refl)
+
+        # it subtracts incident fields afterward, since load_minus_flux_data assigns negated DFT fields.
+        self.sim.load_minus_flux_data(self.refl, mp.FluxData(
+            E=entry_empty['flux_data_E'] - np.array(refl_data.E),
+            H=entry_empty['flux_data_H'] - np.array(refl_data.H),
+        ))
+
+        fluxes_tran_empty = entry_empty['fluxes_tran_empty'].tolist()
+        self.save_empty(refl_empty_data, fluxes_tran_empty)
+        self.time_steps_empty = entry_empty['time_steps_empty']
+
+        return fluxes_tran_empty, entry_empty['epsilons_empty']
+
+    def run_fdtd(self, variables):
+        if self.entry_empty is None and self.run_concurrently:
+            fluxes_tran_empty, epsilons_empty = self.run_simulations_concurrently()
+        else:
+            if self.entry_empty is None:
+                self.run_simulation_empty()
+
+                refl_empty_data = self.sim_empty.get_flux_data(self.refl_empty)
+                fluxes_tran_empty = mp.get_fluxes(self.tran_empty)
+
+                self.save_empty(refl_empty_data, fluxes_tran_empty)
+                self.time_steps_empty = self.sim_empty.timestep()
+            else:
+                self.print_master('empty-cell simulation loaded from cache', flush=True)
+
+                refl_empty_data = mp.FluxData(
+                    E=self.entry_empty['flux_data_E'],
+                    H=self.entry_empty['flux_data_H'],
+                )
+                fluxes_tran_empty = self.entry_empty['fluxes_tran_empty'].tolist()
+                self.time_steps_empty = 0
+
+            self.sim.load_minus_flux_data(self.refl, refl_empty_data)
+
+            self.run_simulation()
+
+            if self.sim_empty is not None:
+                epsilons_empty = self.sim_empty.get_epsilon()
+            else:
+                epsilons_empty = None
+
+        self.time_steps = self.sim.timestep()
+
         epsilons = self.sim.get_epsilon()
+        if epsilons_empty is None:
+            epsilons_empty = np.ones_like(epsilons)
 
         fluxes_refl = mp.get_fluxes(self.refl)
         fluxes_tran = mp.get_fluxes(self.tran)
 
         freq_refl = mp.get_flux_freqs(self.refl)
         assert np.all(np.array(freq_refl) == np.array(mp.get_flux_freqs(self.tran)))
+
+        if len(freq_refl) < self.get_frequency_info()[2]:
+            freq_refl, fluxes_tran_empty, fluxes_refl, fluxes_tran = self.reconstruct_fluxes(
+                freq_refl, fluxes_tran_empty, fluxes_refl, fluxes_tran)
+
+            # a reconstruction beyond its tolerance is discarded, so that a design is simulated again with every frequency monitored.
+            if self.error_reconstruction > self.tolerance_reconstruction:
+                self.print_master(f'reconstruction error exceeds {self.tolerance_reconstruction:.4e}; running again with all frequencies monitored', flush=True)
+
+                num_frequencies_monitored = self.num_frequencies_monitored
+                self.num_frequencies_monitored = None
+
+                try:
+                    self.reset()
+                    self.define_experiment(variables)
+
+                    freq_refl, fluxes_tran_empty, fluxes_refl, fluxes_tran, epsilons_empty, epsilons = self.run_fdtd(variables)
+                finally:
+                    self.num_frequencies_monitored = num_frequencies_monitored
+
+                self.error_reconstruction = None
+
+        return freq_refl, fluxes_tran_empty, fluxes_refl, fluxes_tran, epsilons_empty, epsilons
+
+    def _run(self, variables):
+        time_start = time.time()
+        utils_cost.reset_memory_peak()
+        variables_original = variables
+        variables = self.transform(variables)
+
+        self.change_size_cell(variables)
+        self.print_experiment_info(variables)
+
+        if self.backend == 'fdtd':
+            self.define_experiment(variables)
+
+            if self.use_cache_voxelization:
+                dict_all = self.load_voxelization(variables_original, variables)
+
+                if dict_all is not None:
+                    dict_all['time_elapsed'] = time.time() - time_start
+
+                    if self.save_properties:
+                        self.save(dict_all)
+
+                    # meep is initialized only for figures, so that a reused voxelization costs no simulation.
+                    if self.show_figures or self.save_figures:
+                        epsilons = self.sim.get_epsilon()
+
+                        return dict_all, np.ones_like(epsilons), epsilons
+                    else:
+                        return dict_all, None, None
+
+            freq_refl, fluxes_tran_empty, fluxes_refl, fluxes_tran, epsilons_empty, epsilons = self.run_fdtd(variables)
+        else:
+            self.verify(variables)
+
+            freq_refl, fluxes_tran_empty, fluxes_refl, fluxes_tran = self.compute_fluxes_backend(variables[np.newaxis, ...])
+
+            freq_refl = list(freq_refl)
+            fluxes_tran_empty = list(fluxes_tran_empty)
+            fluxes_refl = list(fluxes_refl[0])
+            fluxes_tran = list(fluxes_tran[0])
+
+            epsilons_empty = None
+            epsilons = None
         time_end = time.time()
 
         dict_all = self.compute_properties(
@@ -527,12 +1280,100 @@ class BaseStructure(abc.ABC):
             fluxes_tran
         )
         dict_all['time_elapsed'] = time_end - time_start
+        dict_all['backend'] = self.backend
+
+        if self.hash_voxelization is not None:
+            dict_all['hash_voxelization'] = self.hash_voxelization
+
+        dict_all['memory_peak'] = utils_cost.get_memory_peak()
+
+        if self.backend == 'fdtd':
+            dict_all['stop_policy'] = self.stop_policy
+            dict_all['time_steps_empty'] = self.time_steps_empty
+            dict_all['time_steps'] = self.time_steps
+
+        if self.error_reconstruction is not None:
+            dict_all['num_frequencies_monitored'] = self.get_num_frequencies_monitored()
+            dict_all['error_reconstruction'] = self.error_reconstruction
 
         if self.save_properties:
             self.save(dict_all)
 
         return dict_all, epsilons_empty, epsilons
 
+    def run_verification_symmetries(self, variables, tolerance=constants.tolerance_symmetries):
+        assert self.backend == 'fdtd'
+        assert self.use_symmetries
+        assert len(self.mirror_directions) > 0
+
+        save_properties = self.save_properties
+
+        self.save_properties = False
+        self.apply_symmetries = False
+        dict_reference = self.run(variables)
+
+        self.save_properties = save_properties
+        self.apply_symmetries = True
+        dict_all = self.run(variables)
+
+        errors = {}
+        for label in ['transmittance', 'reflectance', 'absorbance']:
+            errors[label] = np.max(np.abs(dict_all[label] - dict_reference[label]))
+
+        self.print_master('', flush=True)
+        self.print_separators()
+        for label in errors:
+            self.print_master(f'max error of {label} with symmetries {errors[label]}', flush=True)
+        self.print_master(f'time_elapsed without symmetries {dict_reference["time_elapsed"]}', flush=True)
+        self.print_master(f'time_elapsed with symmetries {dict_all["time_elapsed"]}', flush=True)
+        self.print_separators()
+        self.print_master('', flush=True)
+
+        is_verified = bool(np.all([errors[label] <= tolerance for label in errors]))
+
+        return dict_all, errors, is_verified
+
+    def run_batch(self, variables_batch):
+        assert isinstance(variables_batch, np.ndarray)
+        assert len(variables_batch.shape) == 2
+        assert self.backend != 'fdtd'
+
+        time_start = time.time()
+        variables_batch_original = variables_batch
+        variables_batch = self.transform(variables_batch)
+
+        for variables in variables_batch:
+            self.change_size_cell(variables)
+            self.verify(variables)
+
+        freq_refl, fluxes_tran_empty, fluxes_refl, fluxes_tran = self.compute_fluxes_backend(variables_batch)
+        time_end = time.time()
+
+        list_dict_all = []
+
+        for ind_design in range(0, variables_batch.shape[0]):
+            dict_all = self.compute_properties(
+                variables_batch_original[ind_design],
+                variables_batch[ind_design],
+                list(freq_refl),
+                list(fluxes_tran_empty),
+                list(fluxes_refl[ind_design]),
+                list(fluxes_tran[ind_design])
+            )
+            dict_all['time_elapsed'] = (time_end - time_start) / variables_batch.shape[0]
+            dict_all['backend'] = self.backend
+
+            if self.save_properties and self.format_properties == 'npy':
+                self.save(dict_all)
+
+            list_dict_all.append(dict_all)
+
+        # a batch is appended at once, so that the store is locked once per batch.
+        if self.save_properties and self.format_properties == 'hdf5':
+            self.save_store(list_dict_all)
+
+        return list_dict_all
+
     @property
     @abc.abstractmethod
     def num_variables(self):
@@ -552,6 +1393,10 @@ class BaseStructure(abc.ABC):
     def verify_specific(self, variables):
         pass
 
+    def get_constraints(self, variables):
+        # returns a list of conditions, which are elementwise for variables of shape (num_variables, num_designs)
+        return []
+
     @abc.abstractmethod
     def define_geometries(self):
         pass
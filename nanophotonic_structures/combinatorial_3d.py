@@ -3,6 +3,7 @@ import meep as mp
 
 from nanophotonic_structures import base_structure
 from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_geometry
 
 
 class Combinatorial3D(base_structure.BaseStructure):
@@ -16,6 +17,8 @@ class Combinatorial3D(base_structure.BaseStructure):
         save_figures=False,
         save_properties=False,
         save_efields_hfields=False,
+        use_material_grid=False,
+        **kwargs,
     ):
         name = self.__class__.__name__.lower()
         wavelength = constants.wavelength_solar
@@ -26,7 +29,8 @@ class Combinatorial3D(base_structure.BaseStructure):
 
         super().__init__(
             name, mode, size_cell, depth_pml, size_mesh, materials,
-            show_figures, save_figures, save_properties, save_efields_hfields, wavelength
+            show_figures, save_figures, save_properties, save_efields_hfields, wavelength,
+            **kwargs,
         )
 
         self.index_air = 1
@@ -39,6 +43,9 @@ class Combinatorial3D(base_structure.BaseStructure):
         self.num_y = int(self.size_repeating_unit_y // self.size_material_block)
         self.num_z = int(self.size_repeating_unit_z // self.size_material_block)
 
+        assert isinstance(use_material_grid, bool)
+        self.use_material_grid = use_material_grid
+
     @property
     def num_variables(self):
         return self.num_x * self.num_y * self.num_z
@@ -55,16 +62,7 @@ class Combinatorial3D(base_structure.BaseStructure):
         assert variables.shape[0] == self.num_variables
         assert len(self.list_materials) == self.num_materials
 
-        variables_recovered = variables * self.unit_length
-        variables_recovered = variables_recovered.astype(np.int64)
-
-        assert np.all(0 <= variables_recovered)
-        assert np.all(variables_recovered < self.num_materials)
-
-        limit_y_positive, limit_y_negative = self.get_limit_y()
-
-        assert self.size_repeating_unit_z * 0.5 <= limit_y_negative
-        assert self.size_repeating_unit_z * 0.5 <= limit_y_positive
+        assert np.all(self.get_constraints(variables))
 
         assert self.size_material_block == self.transform(10)
         assert self.size_repeating_unit_x == self.transform(200)
@@ -77,7 +75,35 @@ class Combinatorial3D(base_structure.BaseStructure):
 
         assert self.list_materials[self.index_air] == 'air'
 
+    def get_material_indices(self, variables):
+        variables_recovered = variables * self.unit_length
+        variables_recovered = variables_recovered.astype(np.int64)
+
+        material_indices = np.reshape(variables_recovered, (self.num_x, self.num_y, self.num_z), order='C')
+
+        return material_indices
+
+    def get_num_voxels_block(self):
+        return max(int(np.round(self.size_material_block * self.resolution)), 1)
+
     def define_geometries(self, variables):
+        if self.use_material_grid:
+            self.define_geometries_material_grids(variables)
+        else:
+            self.define_geometries_blocks(variables)
+
+    def define_geometries_material_grids(self, variables):
+        # the repeating unit is placed along x and z of meep, and its height is along y of meep.
+        material_indices = np.transpose(self.get_material_indices(variables), (0, 2, 1))
+
+        self.extra_materials = [
+            self.materials[index] for index in np.unique(material_indices) if index != self.index_air
+        ]
+
+        self.geometries = utils_geometry.get_geometries_material_grids(
+            material_indices, self.materials, self.index_air, self.size_material_block, self.get_num_voxels_block())
+
+    def define_geometries_blocks(self, variables):
         variables_recovered = variables * self.unit_length
         variables_recovered = variables_recovered.astype(np.int64)
 
@@ -104,6 +130,19 @@ class Combinatorial3D(base_structure.BaseStructure):
 
         self.geometries = geometries
 
+    def get_constraints(self, variables):
+        variables_recovered = variables * self.unit_length
+        variables_recovered = variables_recovered.astype(np.int64)
+
+        limit_y_positive, limit_y_negative = self.get_limit_y()
+
+        return [
+            np.all(0 <= variables_recovered, axis=0),
+            np.all(variables_recovered < self.num_materials, axis=0),
+            self.size_repeating_unit_z * 0.5 <= limit_y_negative,
+            self.size_repeating_unit_z * 0.5 <= limit_y_positive,
+        ]
+
     def parse(self, variables):
         # not used for this structure
         return variables
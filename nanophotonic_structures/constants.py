@@ -129,3 +129,27 @@ materials_threelayers = [
     ['ITO', 'Ag', 'ITO'],
     ['AZO', 'Ag', 'AZO'],
 ]
+
+##
+order_fourier_rcwa = 20
+num_slices_rcwa = 20
+
+##
+tolerance_symmetries = 1e-2
+
+##
+tolerance_reconstruction = 1e-4
+
+##
+num_subpixels_voxelization = 2
+
+##
+tolerance_stop_fluxes = 1e-3
+
+##
+size_buffer_store = 64
+
+##
+charge_elementary = 1.602176634e-19
+constant_planck = 6.62607015e-34
+speed_light = 299792458.0
@@ -6,6 +6,8 @@ from nanophotonic_structures import constants
 
 
 class DoubleNanocones2D(base_structure.BaseStructure):
+    backends = ['fdtd', 'rcwa']
+
     def __init__(
         self,
         depth_pml,
@@ -17,13 +19,15 @@ class DoubleNanocones2D(base_structure.BaseStructure):
         save_figures=False,
         save_properties=False,
         save_efields_hfields=False,
+        **kwargs,
     ):
         name = self.__class__.__name__.lower()
         wavelength = constants.wavelength_visible
 
         super().__init__(
             name, mode, size_cell, depth_pml, size_mesh, materials,
-            show_figures, save_figures, save_properties, save_efields_hfields, wavelength
+            show_figures, save_figures, save_properties, save_efields_hfields, wavelength,
+            **kwargs,
         )
 
     @property
@@ -46,13 +50,18 @@ class DoubleNanocones2D(base_structure.BaseStructure):
         assert variables.shape[0] == self.num_variables
         assert len(self.list_materials) == self.num_materials
 
+        assert np.all(self.get_constraints(variables))
+
+        assert self.size_cell[2] == 0
+
+    def get_constraints(self, variables):
         thickness_first, thickness_second, thickness_third, radius_first, height_first, radius_second, height_second = self.parse(variables)
         limit_y_positive, limit_y_negative = self.get_limit_y()
 
-        assert (thickness_first + 0.5 * thickness_second + height_first) <= limit_y_negative
-        assert (thickness_third + 0.5 * thickness_second + height_second) <= limit_y_positive
-
-        assert self.size_cell[2] == 0
+        return [
+            (thickness_first + 0.5 * thickness_second + height_first) <= limit_y_negative,
+            (thickness_third + 0.5 * thickness_second + height_second) <= limit_y_positive,
+        ]
 
     def define_geometries(self, variables):
         thickness_first, thickness_second, thickness_third, radius_first, height_first, radius_second, height_second = self.parse(variables)
@@ -134,6 +143,35 @@ class DoubleNanocones2D(base_structure.BaseStructure):
                 self.size_cell[2],
             ]
 
+    def get_layers_rcwa(self, variables, permittivities):
+        thickness_first, thickness_second, thickness_third, radius_first, height_first, radius_second, height_second = self.parse(variables)
+
+        permittivities_first = permittivities[self.list_materials[0]]
+        permittivities_second = permittivities[self.list_materials[1]]
+        permittivities_third = permittivities[self.list_materials[2]]
+        permittivities_cones_first = permittivities[self.list_materials[3]]
+        permittivities_cones_second = permittivities[self.list_materials[4]]
+
+        period = 2 * np.maximum(radius_first, radius_second)
+        layers = []
+
+        # cones are approximated by staircases, sliced at the midpoints of slices.
+        for ind_slice in range(0, self.num_slices):
+            half_width = radius_first * (ind_slice + 0.5) / self.num_slices
+
+            layers.append((height_first / self.num_slices, permittivities['air'], [(-half_width, half_width)], [permittivities_cones_first]))
+
+        layers.append((thickness_first, permittivities_first, [], []))
+        layers.append((thickness_second, permittivities_second, [], []))
+        layers.append((thickness_third, permittivities_third, [], []))
+
+        for ind_slice in range(0, self.num_slices):
+            half_width = radius_second * (1.0 - (ind_slice + 0.5) / self.num_slices)
+
+            layers.append((height_second / self.num_slices, permittivities['air'], [(-half_width, half_width)], [permittivities_cones_second]))
+
+        return period, layers
+
     def run(self, variables):
         dict_all, _, _ = self._run(variables)
 
@@ -6,6 +6,8 @@ from nanophotonic_structures import constants
 
 
 class Nanocones3D(base_structure.BaseStructure):
+    mirror_directions = [mp.X, mp.Z]
+
     def __init__(
         self,
         depth_pml,
@@ -17,13 +19,15 @@ class Nanocones3D(base_structure.BaseStructure):
         save_figures=False,
         save_properties=False,
         save_efields_hfields=False,
+        **kwargs,
     ):
         name = self.__class__.__name__.lower()
         wavelength = constants.wavelength_solar
 
         super().__init__(
             name, mode, size_cell, depth_pml, size_mesh, materials,
-            show_figures, save_figures, save_properties, save_efields_hfields, wavelength
+            show_figures, save_figures, save_properties, save_efields_hfields, wavelength,
+            **kwargs,
         )
 
     @property
@@ -42,10 +46,15 @@ class Nanocones3D(base_structure.BaseStructure):
         assert variables.shape[0] == self.num_variables
         assert len(self.list_materials) == self.num_materials
 
+        assert np.all(self.get_constraints(variables))
+
+    def get_constraints(self, variables):
         radius, height = self.parse(variables)
         limit_y_positive, limit_y_negative = self.get_limit_y()
 
-        assert height <= limit_y_negative
+        return [
+            height <= limit_y_negative,
+        ]
 
     def define_geometries(self, variables):
         radius, height = self.parse(variables)
@@ -6,6 +6,8 @@ from nanophotonic_structures import constants
 
 
 class Nanowires2D(base_structure.BaseStructure):
+    backends = ['fdtd', 'rcwa']
+
     def __init__(
         self,
         depth_pml,
@@ -17,13 +19,15 @@ class Nanowires2D(base_structure.BaseStructure):
         save_figures=False,
         save_properties=False,
         save_efields_hfields=False,
+        **kwargs,
     ):
         name = self.__class__.__name__.lower()
         wavelength = constants.wavelength_solar
 
         super().__init__(
             name, mode, size_cell, depth_pml, size_mesh, materials,
-            show_figures, save_figures, save_properties, save_efields_hfields, wavelength
+            show_figures, save_figures, save_properties, save_efields_hfields, wavelength,
+            **kwargs,
         )
 
     @property
@@ -42,13 +46,18 @@ class Nanowires2D(base_structure.BaseStructure):
         assert variables.shape[0] == self.num_variables
         assert len(self.list_materials) == self.num_materials
 
+        assert np.all(self.get_constraints(variables))
+
+        assert self.size_cell[2] == 0
+
+    def get_constraints(self, variables):
         pitch_m_two_radius, radius, height = self.parse(variables)
         limit_y_positive, limit_y_negative = self.get_limit_y()
 
-        assert 0.5 * height <= limit_y_negative
-        assert 0.5 * height <= limit_y_positive
-
-        assert self.size_cell[2] == 0
+        return [
+            0.5 * height <= limit_y_negative,
+            0.5 * height <= limit_y_positive,
+        ]
 
     def define_geometries(self, variables):
         pitch_m_two_radius, radius, height = self.parse(variables)
@@ -86,6 +95,16 @@ class Nanowires2D(base_structure.BaseStructure):
                 self.size_cell[2]
             ]
 
+    def get_layers_rcwa(self, variables, permittivities):
+        pitch_m_two_radius, radius, height = self.parse(variables)
+
+        period = pitch_m_two_radius + 2 * radius
+        layers = [
+            (height, permittivities['air'], [(-radius, radius)], [permittivities[self.list_materials[0]]]),
+        ]
+
+        return period, layers
+
     def run(self, variables):
         dict_all, _, _ = self._run(variables)
 
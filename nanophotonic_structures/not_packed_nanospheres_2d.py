@@ -17,13 +17,15 @@ class NotPackedNanospheres2D(base_structure.BaseStructure):
         save_figures=False,
         save_properties=False,
         save_efields_hfields=False,
+        **kwargs,
     ):
         name = self.__class__.__name__.lower()
         wavelength = constants.wavelength_solar
 
         super().__init__(
             name, mode, size_cell, depth_pml, size_mesh, materials,
-            show_figures, save_figures, save_properties, save_efields_hfields, wavelength
+            show_figures, save_figures, save_properties, save_efields_hfields, wavelength,
+            **kwargs,
         )
 
     @property
@@ -42,14 +44,19 @@ class NotPackedNanospheres2D(base_structure.BaseStructure):
         assert variables.shape[0] == self.num_variables
         assert len(self.list_materials) == self.num_materials
 
+        assert np.all(self.get_constraints(variables))
+
+        assert self.size_cell[2] == 0
+
+    def get_constraints(self, variables):
         thickness, radius, pitch = self.parse(variables)
         limit_y_positive, limit_y_negative = self.get_limit_y()
 
-        assert 2 * radius <= limit_y_negative
-        assert thickness <= limit_y_positive
-        assert 2 * radius <= pitch
-
-        assert self.size_cell[2] == 0
+        return [
+            2 * radius <= limit_y_negative,
+            thickness <= limit_y_positive,
+            2 * radius <= pitch,
+        ]
 
     def define_geometries(self, variables):
         thickness, radius, pitch = self.parse(variables)
@@ -1,5 +1,10 @@
 import numpy as np
 import os
+import json
+import hashlib
+import fcntl
+import tempfile
+import contextlib
 import h5py
 import torch
 import sklearn.model_selection as sklms
@@ -10,28 +15,52 @@ from nanophotonic_structures.surrogates import dataset
 from nanophotonic_structures.utils import utils_structures
 from nanophotonic_structures.utils import utils_solar
 from nanophotonic_structures.utils import utils_standardilluminant
+from nanophotonic_structures.utils import utils_cache
+from nanophotonic_structures.utils import utils_efficiency
+
+
+# it is increased whenever convert_dataset changes its targets, so that cached targets are not reused.
+version_targets = 1
 
 
 def random_seed():
     torch.manual_seed(42)
     np.random.seed(42)
 
-def load_dataset(path_collected_datasets, str_structure, ind_materials, str_fidelity, str_property):
+@contextlib.contextmanager
+def open_dataset(path_collected_datasets, str_structure, ind_materials, str_fidelity, str_property):
+    # variables and values are h5py datasets, which are valid while the files are open.
     _, _, size_mesh, materials = utils_structures.get_structure(
         str_structure, ind_materials, str_fidelity)
     str_materials = '_'.join(materials)
 
     size_mesh /= constants.unit_length
 
-    str_variables = f'{str_structure}_{str_materials}_{size_mesh}_variables.h5'
-    str_wavelengths = f'{str_structure}_{str_materials}_{size_mesh}_wavelengths.h5'
-    str_file = f'{str_structure}_{str_materials}_{size_mesh}_{str_property}.h5'
-    print(f'{os.path.join(path_collected_datasets, str_file)}')
+    path_variables, path_wavelengths, path_file = get_paths_dataset(
+        path_collected_datasets, str_structure, ind_materials, str_fidelity, str_property)
+    print(f'{path_file}')
+
+    with h5py.File(path_variables, 'r') as file_variables, \
+            h5py.File(path_wavelengths, 'r') as file_wavelengths, \
+            h5py.File(path_file, 'r') as file_values:
+        variables = file_variables['data']
+        wavelengths = file_wavelengths['data'][()]
+        values = file_values['data']
+
+        verify_dataset(variables, values)
 
-    variables = np.array(h5py.File(os.path.join(path_collected_datasets, str_variables), 'r')['data'])
-    wavelengths = np.array(h5py.File(os.path.join(path_collected_datasets, str_wavelengths), 'r')['data'])
-    values = np.array(h5py.File(os.path.join(path_collected_datasets, str_file), 'r')['data'])
+        yield variables, wavelengths, values, str_materials, size_mesh, materials
 
+def load_dataset(path_collected_datasets, str_structure, ind_materials, str_fidelity, str_property):
+    with open_dataset(path_collected_datasets, str_structure, ind_materials, str_fidelity, str_property) as (
+        variables, wavelengths, values, str_materials, size_mesh, materials
+    ):
+        variables = variables[()]
+        values = values[()]
+
+    return variables, wavelengths, values, str_materials, size_mesh, materials
+
+def verify_dataset(variables, values):
     assert len(variables.shape) == 3 or len(variables.shape) == 4 or len(variables.shape) == 8
     assert len(values.shape) == 3 or len(values.shape) == 4 or len(values.shape) == 8
     assert variables.shape[0] == values.shape[0]
@@ -47,8 +76,6 @@ def load_dataset(path_collected_datasets, str_structure, ind_materials, str_fide
         assert variables.shape[5] == values.shape[5]
         assert variables.shape[6] == values.shape[6]
 
-    return variables, wavelengths, values, str_materials, size_mesh, materials
-
 def convert_dataset(variables, wavelengths, values, materials, str_structure):
     X = np.reshape(
         variables,
@@ -62,6 +89,11 @@ def convert_dataset(variables, wavelengths, values, materials, str_structure):
         order='C'
     )
 
+    # points without results hold NaN in collected datasets, so that they are excluded.
+    is_collected = ~np.any(np.isnan(Y), axis=1)
+    X = X[is_collected]
+    Y = Y[is_collected]
+
     if Y.shape[1] == 1:
         by = Y[:, 0]
     elif Y.shape[1] == 4000:
@@ -85,6 +117,141 @@ def convert_dataset(variables, wavelengths, values, materials, str_structure):
 
     return X, by
 
+def convert_dataset_blocks(variables, wavelengths, values, materials, str_structure, max_bytes_block=utils_efficiency.max_bytes_block):
+    # blocks of values are read and converted one at a time, so that memory is bounded by max_bytes_block,
+    # and they follow C order, so that X and by are identical to those of convert_dataset.
+    list_X = []
+    list_by = []
+
+    for key in utils_efficiency.get_keys_blocks(
+        values.shape, np.dtype(values.dtype).itemsize, max_bytes_block, getattr(values, 'chunks', None)
+    ):
+        X_block, by_block = convert_dataset(
+            np.asarray(variables[key]), wavelengths, np.asarray(values[key]), materials, str_structure)
+
+        list_X.append(X_block)
+        list_by.append(by_block)
+
+    return np.concatenate(list_X, axis=0), np.concatenate(list_by, axis=0)
+
+def get_paths_dataset(path_collected_datasets, str_structure, ind_materials, str_fidelity, str_property):
+    _, _, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+    str_materials = '_'.join(materials)
+
+    size_mesh /= constants.unit_length
+
+    return [
+        os.path.join(path_collected_datasets, f'{str_structure}_{str_materials}_{size_mesh}_{label}.h5')
+        for label in ['variables', 'wavelengths', str_property]
+    ]
+
+def get_materials_targets(str_structure, materials):
+    # efficiencies of these structures do not use cutoff wavelengths of their materials.
+    if str_structure in [
+        'threelayers2d',
+        'threelayers3d',
+        'nanocones2d',
+        'nanocones3d',
+        'doublenanocones2d',
+        'doublenanocones3d',
+    ]:
+        materials = []
+
+    return materials
+
+def read_hashes(path_index):
+    # an index that is missing or fails to parse is an empty cache, since hashes can always be computed again.
+    try:
+        with open(path_index, 'r') as file_index:
+            hashes = json.load(file_index)
+    except (OSError, ValueError):
+        return {}
+
+    return hashes if isinstance(hashes, dict) else {}
+
+def get_hash_file(path_file, path_targets):
+    # content hashes are memoized by path, size, and modification time, so that unchanged files are not read again.
+    stat = os.stat(path_file)
+    str_entry = f'{os.path.abspath(path_file)}:{stat.st_size}:{stat.st_mtime_ns}'
+    path_index = os.path.join(path_targets, 'hashes.json')
+
+    hashes = read_hashes(path_index)
+
+    if str_entry in hashes:
+        return hashes[str_entry]
+
+    hasher = hashlib.sha256()
+
+    with open(path_file, 'rb') as file_source:
+        for block in iter(lambda: file_source.read(16 * 1024**2), b''):
+            hasher.update(block)
+
+    str_hash = hasher.hexdigest()
+
+    # concurrent jobs merge their entries under a lock, and a unique temporary file is replaced atomically,
+    # so that no entry is lost and no reader sees a half-written index.
+    with open(f'{path_index}.lock', 'a') as file_lock:
+        fcntl.flock(file_lock, fcntl.LOCK_EX)
+
+        try:
+            hashes = read_hashes(path_index)
+            hashes[str_entry] = str_hash
+
+            descriptor_temporary, path_temporary = tempfile.mkstemp(prefix='hashes.json.', suffix='.tmp', dir=path_targets)
+            with os.fdopen(descriptor_temporary, 'w') as file_index:
+                json.dump(hashes, file_index)
+            os.replace(path_temporary, path_index)
+        finally:
+            fcntl.flock(file_lock, fcntl.LOCK_UN)
+
+    return str_hash
+
+def load_targets(
+    path_collected_datasets, path_targets, str_structure, ind_materials, str_fidelity, str_property,
+    max_bytes_block=utils_efficiency.max_bytes_block
+):
+    # (X, by) of convert_dataset, cached on disk and memory-mapped on reuse
+    if not os.path.exists(path_targets):
+        os.makedirs(path_targets, exist_ok=True)
+
+    _, _, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+    str_materials = '_'.join(materials)
+    size_mesh /= constants.unit_length
+
+    materials_targets = get_materials_targets(str_structure, materials)
+
+    hashes = [
+        get_hash_file(path_file, path_targets)
+        for path_file in get_paths_dataset(path_collected_datasets, str_structure, ind_materials, str_fidelity, str_property)
+    ]
+    key = utils_cache.get_key([hashes, str_structure, materials_targets, version_targets])
+
+    path_X = os.path.join(path_targets, f'targets_{key}_X.npy')
+    path_by = os.path.join(path_targets, f'targets_{key}_by.npy')
+
+    if os.path.exists(path_X) and os.path.exists(path_by):
+        print(f'cached targets at {path_X}', flush=True)
+
+        X = np.load(path_X, mmap_mode='r')
+        by = np.load(path_by, mmap_mode='r')
+    else:
+        with open_dataset(path_collected_datasets, str_structure, ind_materials, str_fidelity, str_property) as (
+            variables, wavelengths, values, _, _, _
+        ):
+            X, by = convert_dataset_blocks(variables, wavelengths, values, materials_targets, str_structure, max_bytes_block)
+
+        # by is written last, so that a complete pair exists only after both files are in place.
+        for path_file, array in [(path_X, X), (path_by, by)]:
+            path_temporary = f'{path_file}.{os.getpid()}.tmp'
+
+            with open(path_temporary, 'wb') as file_array:
+                np.save(file_array, array)
+            os.replace(path_temporary, path_file)
+
+    return X, by, str_materials, size_mesh
+
 def split_dataset(X, by):
     test_size = 0.2
     valid_size = 0.1 / (1.0 - test_size)
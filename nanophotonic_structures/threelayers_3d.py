@@ -3,9 +3,13 @@ import meep as mp
 
 from nanophotonic_structures import base_structure
 from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_tmm
 
 
 class ThreeLayers3D(base_structure.BaseStructure):
+    backends = ['fdtd', 'tmm']
+    mirror_directions = [mp.X, mp.Z]
+
     def __init__(
         self,
         depth_pml,
@@ -17,13 +21,15 @@ class ThreeLayers3D(base_structure.BaseStructure):
         save_figures=False,
         save_properties=False,
         save_efields_hfields=False,
+        **kwargs,
     ):
         name = self.__class__.__name__.lower()
         wavelength = constants.wavelength_default
 
         super().__init__(
             name, mode, size_cell, depth_pml, size_mesh, materials,
-            show_figures, save_figures, save_properties, save_efields_hfields, wavelength
+            show_figures, save_figures, save_properties, save_efields_hfields, wavelength,
+            **kwargs,
         )
 
     @property
@@ -42,11 +48,16 @@ class ThreeLayers3D(base_structure.BaseStructure):
         assert variables.shape[0] == self.num_variables
         assert len(self.list_materials) == self.num_materials
 
+        assert np.all(self.get_constraints(variables))
+
+    def get_constraints(self, variables):
         thickness_first, thickness_second, thickness_third = self.parse(variables)
         limit_y_positive, limit_y_negative = self.get_limit_y()
 
-        assert (thickness_first + 0.5 * thickness_second) <= limit_y_negative
-        assert (thickness_third + 0.5 * thickness_second) <= limit_y_positive
+        return [
+            (thickness_first + 0.5 * thickness_second) <= limit_y_negative,
+            (thickness_third + 0.5 * thickness_second) <= limit_y_positive,
+        ]
 
     def define_geometries(self, variables):
         thickness_first, thickness_second, thickness_third = self.parse(variables)
@@ -90,6 +101,16 @@ class ThreeLayers3D(base_structure.BaseStructure):
                 self.transform(10),
             ]
 
+    def compute_spectra_tmm(self, variables, frequencies):
+        permittivities = self.get_permittivities(frequencies)
+        permittivities = np.array([permittivities[str_material] for str_material in self.list_materials])
+        thicknesses = np.stack(self.parse(variables.T), axis=1)
+
+        transmittance, reflectance = utils_tmm.compute_transmittance_reflectance(
+            frequencies, permittivities, thicknesses)
+
+        return transmittance, reflectance
+
     def run(self, variables):
         dict_all, epsilons_empty, epsilons = self._run(variables)
 
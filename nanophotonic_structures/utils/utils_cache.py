@@ -0,0 +1,154 @@
+import numpy as np
+import os
+import hashlib
+import collections
+
+
+class CacheEmpty:
+    def __init__(self, path_cache=None, max_entries_memory=16, max_bytes_disk=2 * 1024**3):
+        assert isinstance(path_cache, (type(None), str))
+        assert isinstance(max_entries_memory, int)
+        assert isinstance(max_bytes_disk, int)
+        assert max_entries_memory > 0
+        assert max_bytes_disk > 0
+
+        self.path_cache = path_cache
+        self.max_entries_memory = max_entries_memory
+        self.max_bytes_disk = max_bytes_disk
+
+        self.entries = collections.OrderedDict()
+
+    def get_path_entry(self, key):
+        return os.path.join(self.path_cache, f'empty_{key}.npz')
+
+    def get(self, key):
+        assert isinstance(key, str)
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        if self.path_cache is None:
+            return None
+
+        path_entry = self.get_path_entry(key)
+
+        try:
+            with np.load(path_entry) as data:
+                entry = {
+                    'flux_data_E': data['flux_data_E'],
+                    'flux_data_H': data['flux_data_H'],
+                    'fluxes_tran_empty': data['fluxes_tran_empty'],
+                }
+            os.utime(path_entry)
+        except (OSError, KeyError, ValueError):
+            return None
+
+        self.put_memory(key, entry)
+
+        return entry
+
+    def put(self, key, entry):
+        assert isinstance(key, str)
+        assert isinstance(entry, dict)
+
+        self.put_memory(key, entry)
+
+        if self.path_cache is not None:
+            self.put_disk(key, entry)
+
+    def put_memory(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries_memory:
+            self.entries.popitem(last=False)
+
+    def put_disk(self, key, entry):
+        if not os.path.exists(self.path_cache):
+            os.makedirs(self.path_cache, exist_ok=True)
+
+        path_entry = self.get_path_entry(key)
+        path_temporary = f'{path_entry}.{os.getpid()}.tmp'
+
+        with open(path_temporary, 'wb') as file_entry:
+            np.savez(file_entry, **entry)
+        os.replace(path_temporary, path_entry)
+
+        self.evict_disk()
+
+    def evict_disk(self):
+        list_entries = []
+
+        for str_file in os.listdir(self.path_cache):
+            if not (str_file.startswith('empty_') and str_file.endswith('.npz')):
+                continue
+
+            path_entry = os.path.join(self.path_cache, str_file)
+
+            try:
+                stat = os.stat(path_entry)
+            except OSError:
+                continue
+
+            list_entries.append((stat.st_mtime, stat.st_size, path_entry))
+
+        list_entries.sort()
+        bytes_total = sum([size for _, size, _ in list_entries])
+
+        for _, size, path_entry in list_entries:
+            if bytes_total <= self.max_bytes_disk:
+                break
+
+            try:
+                os.remove(path_entry)
+            except OSError:
+                pass
+
+            bytes_total -= size
+
+
+caches = {}
+
+def get_cache(path_cache=None, max_entries_memory=16, max_bytes_disk=2 * 1024**3):
+    if path_cache not in caches:
+        caches[path_cache] = CacheEmpty(
+            path_cache=path_cache,
+            max_entries_memory=max_entries_memory,
+            max_bytes_disk=max_bytes_disk,
+        )
+
+    return caches[path_cache]
+
+def normalize_element(elem):
+    if isinstance(elem, (bool, np.bool_)):
+        return bool(elem)
+    elif isinstance(elem, (int, np.integer)):
+        return int(elem)
+    elif isinstance(elem, (float, np.floating)):
+        return round(float(elem), 12)
+    elif isinstance(elem, (list, tuple, np.ndarray)):
+        return [normalize_element(sub_elem) for sub_elem in elem]
+    else:
+        return str(elem)
+
+def get_key(elements):
+    assert isinstance(elements, (list, tuple))
+
+    str_elements = repr(normalize_element(elements))
+
+    return hashlib.sha256(str_elements.encode('utf-8')).hexdigest()[:32]
+
+def get_key_with_arrays(elements, arrays):
+    # arrays: an iterable of integer arrays, hashed one at a time, so that they are never held in memory together
+    assert isinstance(elements, (list, tuple))
+
+    hasher = hashlib.sha256(get_key(elements).encode('utf-8'))
+
+    for array in arrays:
+        assert isinstance(array, np.ndarray)
+
+        hasher.update(repr(array.shape).encode('utf-8'))
+        hasher.update(np.ascontiguousarray(array).tobytes())
+
+    return hasher.hexdigest()[:32]
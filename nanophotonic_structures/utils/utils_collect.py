@@ -0,0 +1,129 @@
+import numpy as np
+import os
+import h5py
+
+from nanophotonic_structures.utils import utils_grid
+
+
+labels_properties = ['transmittance', 'reflectance', 'absorbance']
+
+
+def get_path_dataset(path_collected_datasets, str_structure, str_materials, size_mesh, label):
+    # size_mesh is in units of unit_length, as in train_test.load_dataset
+    return os.path.join(path_collected_datasets, f'{str_structure}_{str_materials}_{size_mesh}_{label}.h5')
+
+
+class Collector:
+    def __init__(self, path_collected_datasets, str_structure, str_materials, size_mesh, all_variables, dtype_values=np.float32):
+        assert isinstance(path_collected_datasets, str)
+        assert isinstance(all_variables, list)
+
+        self.path_collected_datasets = path_collected_datasets
+        self.str_structure = str_structure
+        self.str_materials = str_materials
+        self.size_mesh = size_mesh
+        self.dtype_values = np.dtype(dtype_values)
+
+        self.grid = utils_grid.Grid(all_variables)
+        self.shape_grid = tuple([int(radix) for radix in self.grid.radices])
+
+    def get_path(self, label):
+        return get_path_dataset(self.path_collected_datasets, self.str_structure, self.str_materials, self.size_mesh, label)
+
+    def is_initialized(self):
+        return np.all([os.path.exists(self.get_path(label)) for label in ['variables', 'wavelengths'] + labels_properties])
+
+    def initialize(self, wavelengths):
+        if not os.path.exists(self.path_collected_datasets):
+            os.makedirs(self.path_collected_datasets, exist_ok=True)
+
+        num_variables = self.grid.num_variables
+        num_wavelengths = wavelengths.shape[0]
+
+        # variables hold every grid point, one slab along the first axis at a time.
+        with h5py.File(self.get_path('variables'), 'w') as file_variables:
+            dataset = file_variables.create_dataset(
+                'data', shape=self.shape_grid + (num_variables, ), dtype=self.grid.dtype,
+                chunks=(1, ) * (num_variables - 1) + (self.shape_grid[-1], num_variables))
+            size_slab = self.grid.strides[0]
+
+            for ind in range(0, self.shape_grid[0]):
+                dataset[ind] = self.grid[ind * size_slab:(ind + 1) * size_slab].reshape(self.shape_grid[1:] + (num_variables, ))
+
+            file_variables.attrs['id_manifest'] = 0
+            file_variables.attrs['num_rows_store'] = 0
+
+        with h5py.File(self.get_path('wavelengths'), 'w') as file_wavelengths:
+            file_wavelengths.create_dataset('data', data=wavelengths)
+
+        # points without results hold NaN, and chunks are allocated only when results arrive.
+        for label in labels_properties:
+            with h5py.File(self.get_path(label), 'w') as file_values:
+                file_values.create_dataset(
+                    'data', shape=self.shape_grid + (num_wavelengths, ), dtype=self.dtype_values,
+                    chunks=(1, ) * (num_variables - 1) + (self.shape_grid[-1], num_wavelengths),
+                    fillvalue=np.nan, compression='gzip', shuffle=True)
+
+    def get_cursors(self):
+        with h5py.File(self.get_path('variables'), 'r') as file_variables:
+            return int(file_variables.attrs['id_manifest']), int(file_variables.attrs['num_rows_store'])
+
+    def set_cursors(self, id_manifest, num_rows_store):
+        with h5py.File(self.get_path('variables'), 'a') as file_variables:
+            file_variables.attrs['id_manifest'] = id_manifest
+            file_variables.attrs['num_rows_store'] = num_rows_store
+
+    def is_on_grid(self, variables_original):
+        return np.all([
+            np.isin(variables_original[:, ind_variable], variables)
+            for ind_variable, variables in enumerate(self.grid.all_variables)
+        ], axis=0)
+
+    def scatter(self, variables_original, wavelengths, dict_values):
+        # variables_original: (num_results, num_variables), dict_values: label to (num_results, num_wavelengths)
+        assert len(variables_original.shape) == 2
+
+        if not self.is_initialized():
+            self.initialize(wavelengths)
+
+        with h5py.File(self.get_path('wavelengths'), 'r') as file_wavelengths:
+            assert np.allclose(file_wavelengths['data'][()], wavelengths)
+
+        # results outside the grid, e.g., from optimization runs, are not part of a dataset.
+        is_on_grid = self.is_on_grid(variables_original)
+        indices = self.grid.encode(variables_original[is_on_grid])
+
+        # a design saved more than once, e.g., by a rerun, keeps its last result.
+        _, inds_last = np.unique(indices[::-1], return_index=True)
+        inds_last = np.sort(indices.shape[0] - 1 - inds_last)
+        inds_selected = np.flatnonzero(is_on_grid)[inds_last]
+        indices = indices[inds_last]
+
+        indices_slab, indices_last = np.divmod(indices, self.shape_grid[-1])
+        indices_slab_unique, inverse = np.unique(indices_slab, return_inverse=True)
+
+        for label in labels_properties:
+            values = np.asarray(dict_values[label])[inds_selected]
+
+            # a slab along the last axis is a single chunk, so that each update reads and writes one chunk.
+            with h5py.File(self.get_path(label), 'a') as file_values:
+                dataset = file_values['data']
+
+                for ind_unique, ind_slab in enumerate(indices_slab_unique):
+                    prefix = np.unravel_index(ind_slab, self.shape_grid[:-1])
+                    is_in_slab = inverse == ind_unique
+
+                    slab = dataset[prefix]
+                    slab[indices_last[is_in_slab]] = values[is_in_slab]
+                    dataset[prefix] = slab
+
+        return int(inds_selected.shape[0])
+
+    def count(self):
+        # the number of grid points with results
+        with h5py.File(self.get_path(labels_properties[0]), 'r') as file_values:
+            dataset = file_values['data']
+
+            return int(np.sum([
+                np.sum(~np.isnan(dataset[ind][..., 0])) for ind in range(0, self.shape_grid[0])
+            ]))
@@ -0,0 +1,142 @@
+import numpy as np
+import heapq
+import resource
+
+
+class CostModel:
+    # log(time) = weights[0] + weights[1:] @ log(features), with features from BaseStructure.get_features_cost
+
+    weights_default = np.array([0.0, 1.0, 1.0, 1.0, 0.0])
+
+    def __init__(self, weights=None):
+        if weights is None:
+            weights = self.weights_default
+
+        assert isinstance(weights, np.ndarray)
+        assert weights.shape == self.weights_default.shape
+
+        self.weights = weights
+
+    def get_design_matrix(self, features):
+        assert isinstance(features, np.ndarray)
+        assert len(features.shape) == 2
+        assert features.shape[1] == self.weights.shape[0] - 1
+
+        return np.concatenate([np.ones((features.shape[0], 1)), np.log(features)], axis=1)
+
+    def fit(self, features, times_elapsed, regularization=1e-3):
+        assert isinstance(times_elapsed, np.ndarray)
+        assert len(times_elapsed.shape) == 1
+        assert features.shape[0] == times_elapsed.shape[0]
+        assert np.all(times_elapsed > 0)
+
+        X = self.get_design_matrix(features)
+        y = np.log(times_elapsed)
+
+        # it shrinks toward the default weights, since some features are constant for a single structure.
+        matrix = X.T @ X + regularization * X.shape[0] * np.eye(X.shape[1])
+        vector = X.T @ y + regularization * X.shape[0] * self.weights_default
+        matrix[0, 0] -= regularization * X.shape[0]
+
+        self.weights = np.linalg.solve(matrix, vector)
+
+        return self
+
+    def predict(self, features):
+        return np.exp(self.get_design_matrix(features) @ self.weights)
+
+    def save(self, path_model):
+        np.save(path_model, {'weights': self.weights})
+
+    @classmethod
+    def load(cls, path_model):
+        return cls(weights=np.load(path_model, allow_pickle=True)[()]['weights'])
+
+class MemoryModel:
+    # memory = overhead + scale * sum(features), with features from BaseStructure.get_features_memory
+
+    overhead_default = 512.0 * 1024**2
+    scale_default = 1.0
+
+    def __init__(self, overhead=None, scale=None):
+        self.overhead = self.overhead_default if overhead is None else overhead
+        self.scale = self.scale_default if scale is None else scale
+
+        assert self.overhead >= 0
+        assert self.scale > 0
+
+    def fit(self, features, memories_peak):
+        assert isinstance(features, np.ndarray)
+        assert isinstance(memories_peak, np.ndarray)
+        assert len(features.shape) == 2
+        assert len(memories_peak.shape) == 1
+        assert features.shape[0] == memories_peak.shape[0]
+
+        memories_raw = np.sum(features, axis=1)
+
+        if np.unique(memories_raw).shape[0] > 1:
+            X = np.stack([np.ones(memories_raw.shape[0]), memories_raw], axis=1)
+            overhead, scale = np.linalg.lstsq(X, memories_peak, rcond=None)[0]
+        else:
+            overhead, scale = -1.0, -1.0
+
+        # it falls back to a scale only, if a fit is degenerate.
+        if overhead < 0 or scale <= 0:
+            overhead = self.overhead_default
+            scale = max(np.median((memories_peak - overhead) / memories_raw), np.finfo(float).eps)
+
+        self.overhead = float(overhead)
+        self.scale = float(scale)
+
+        return self
+
+    def predict(self, features):
+        assert isinstance(features, np.ndarray)
+        assert len(features.shape) == 2
+
+        return self.overhead + self.scale * np.sum(features, axis=1)
+
+    def save(self, path_model):
+        np.save(path_model, {'overhead': self.overhead, 'scale': self.scale})
+
+    @classmethod
+    def load(cls, path_model):
+        dict_model = np.load(path_model, allow_pickle=True)[()]
+        return cls(overhead=dict_model['overhead'], scale=dict_model['scale'])
+
+def reset_memory_peak():
+    # it resets the peak resident set size of this process, which is supported on Linux only.
+    try:
+        with open('/proc/self/clear_refs', 'w') as file_clear_refs:
+            file_clear_refs.write('5')
+    except OSError:
+        pass
+
+def get_memory_peak():
+    # returns the peak resident set size in bytes
+    try:
+        with open('/proc/self/status', 'r') as file_status:
+            for line in file_status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def partition(costs, num_chunks):
+    # the longest processing time first rule, which is deterministic across chunk processes
+    assert isinstance(costs, np.ndarray)
+    assert len(costs.shape) == 1
+    assert num_chunks > 0
+
+    indices_sorted = np.argsort(-costs, kind='stable')
+    heap = [(0.0, ind_chunk) for ind_chunk in range(0, num_chunks)]
+    chunks = [[] for _ in range(0, num_chunks)]
+
+    for ind in indices_sorted:
+        cost_chunk, ind_chunk = heapq.heappop(heap)
+        chunks[ind_chunk].append(ind)
+        heapq.heappush(heap, (cost_chunk + costs[ind], ind_chunk))
+
+    return [np.sort(np.array(chunk, dtype=int)) for chunk in chunks]
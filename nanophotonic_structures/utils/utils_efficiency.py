@@ -0,0 +1,176 @@
+import numpy as np
+
+from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_spectra
+
+
+size_block = 4096
+max_bytes_block = 256 * 1024**2
+
+weights_cached = {}
+
+
+def compute_weights(wavelengths, intensities, cutoff_wavelength=np.inf):
+    # weights w such that values @ w is the mean over trapezoids of intensity-weighted values divided by intensities,
+    # which is the definition of compute_efficiency in utils_solar and utils_standardilluminant.
+    assert len(wavelengths.shape) == 1
+    assert wavelengths.shape == intensities.shape
+
+    indices = np.argsort(wavelengths)
+
+    wavelengths_sorted = wavelengths[indices]
+    intensities_sorted = intensities[indices]
+
+    widths = wavelengths_sorted[1:] - wavelengths_sorted[:-1]
+    denominators = (0.5 * (intensities_sorted[1:] + intensities_sorted[:-1])) * widths
+    is_not_zero = denominators != 0
+
+    # each trapezoid contributes (I_k v_k + I_k+1 v_k+1) / (I_k + I_k+1), with its width canceled.
+    sums = intensities_sorted[1:] + intensities_sorted[:-1]
+    sums[~is_not_zero] = 1.0
+
+    weights_left = np.where(is_not_zero, intensities_sorted[:-1] / sums, 0.0)
+    weights_right = np.where(is_not_zero, intensities_sorted[1:] / sums, 0.0)
+
+    weights_sorted = np.zeros(wavelengths.shape[0])
+    weights_sorted[:-1] += weights_left
+    weights_sorted[1:] += weights_right
+    weights_sorted /= np.sum(is_not_zero)
+
+    # values beyond a cutoff wavelength are zeroed.
+    weights_sorted[wavelengths_sorted > cutoff_wavelength] = 0.0
+
+    weights = np.zeros(wavelengths.shape[0])
+    weights[indices] = weights_sorted
+
+    return weights
+
+def apply_weights(values, weights):
+    # values: (..., num_wavelengths), which are reduced with a matrix-vector product per block of rows
+    assert values.shape[-1] == weights.shape[0]
+
+    shape_values = values.shape
+    values = np.reshape(values, (-1, shape_values[-1]), order='C')
+
+    # wavelengths with zero weights are dropped, so that values there never matter, as in the per-row definition.
+    indices_not_zero = np.nonzero(weights)[0]
+    weights = weights[indices_not_zero]
+
+    efficiencies = np.zeros(values.shape[0])
+
+    for ind_start in range(0, values.shape[0], size_block):
+        block = values[ind_start:ind_start + size_block][:, indices_not_zero].astype(np.float64)
+        efficiencies[ind_start:ind_start + size_block] = block @ weights
+
+    return np.reshape(efficiencies, shape_values[:-1], order='C')
+
+def get_metric(str_spectrum, cutoff_wavelength=np.inf, band=None, use_photon_flux=False):
+    # a figure of merit: a mean ratio of weighted to reference intensities by default,
+    # or a short-circuit current in mA/cm^2 if use_photon_flux, assuming unit quantum efficiency of absorbed photons.
+    assert str_spectrum in utils_spectra.names_spectra
+    assert band is None or (len(band) == 2 and band[0] < band[1])
+    assert isinstance(use_photon_flux, bool)
+    assert not (use_photon_flux and str_spectrum != 'AM1.5G')
+
+    dict_metric = {
+        'spectrum': str_spectrum,
+        'cutoff_wavelength': float(cutoff_wavelength),
+        'band': None if band is None else (float(band[0]), float(band[1])),
+        'use_photon_flux': use_photon_flux,
+    }
+
+    return dict_metric
+
+def get_name_metric(dict_metric):
+    str_name = 'jsc' if dict_metric['use_photon_flux'] else 'efficiency'
+    str_name = f'{str_name}_{dict_metric["spectrum"]}'
+
+    if np.isfinite(dict_metric['cutoff_wavelength']):
+        str_name = f'{str_name}_cutoff_{dict_metric["cutoff_wavelength"]:g}'
+    if dict_metric['band'] is not None:
+        str_name = f'{str_name}_band_{dict_metric["band"][0]:g}_{dict_metric["band"][1]:g}'
+
+    return str_name
+
+def compute_weights_metric(wavelengths, dict_metric):
+    is_in_band = np.ones(wavelengths.shape[0], dtype=bool)
+    if dict_metric['band'] is not None:
+        is_in_band = (dict_metric['band'][0] <= wavelengths) & (wavelengths <= dict_metric['band'][1])
+
+    wavelengths_band = wavelengths[is_in_band]
+    intensities = utils_spectra.get_intensities(dict_metric['spectrum'], wavelengths_band)
+
+    if dict_metric['use_photon_flux']:
+        # trapezoidal weights of photon fluxes, with wavelengths in nm and irradiances in W/m^2/nm
+        indices = np.argsort(wavelengths_band)
+        widths = np.diff(wavelengths_band[indices])
+
+        widths_trapezoid = np.zeros(wavelengths_band.shape[0])
+        widths_trapezoid[indices[:-1]] += 0.5 * widths
+        widths_trapezoid[indices[1:]] += 0.5 * widths
+
+        fluxes_photon = intensities * wavelengths_band * 1e-9 / (constants.constant_planck * constants.speed_light)
+
+        # A/m^2 to mA/cm^2
+        weights_band = constants.charge_elementary * fluxes_photon * widths_trapezoid * 0.1
+        weights_band[wavelengths_band > dict_metric['cutoff_wavelength']] = 0.0
+    else:
+        weights_band = compute_weights(wavelengths_band, intensities, dict_metric['cutoff_wavelength'])
+
+    weights = np.zeros(wavelengths.shape[0])
+    weights[is_in_band] = weights_band
+
+    return weights
+
+def get_weights_metrics(wavelengths, list_metrics):
+    # a weight matrix of (num_wavelengths, num_metrics), memoized per wavelength grid and metrics
+    assert len(wavelengths.shape) == 1
+    assert isinstance(list_metrics, list)
+
+    wavelengths = wavelengths.astype(np.float64)
+    key = (wavelengths.tobytes(), repr(list_metrics))
+
+    if key not in weights_cached:
+        weights_cached[key] = np.stack([compute_weights_metric(wavelengths, dict_metric) for dict_metric in list_metrics], axis=1)
+
+    return weights_cached[key]
+
+def get_keys_blocks(shape, itemsize, max_bytes_block=max_bytes_block, chunks=None):
+    # keys of blocks of an array of shape (..., num_wavelengths) in C order, each of which has at most max_bytes_block,
+    # where a block is a range along the outermost leading axis whose trailing rows fit, aligned to chunks if given.
+    shape_leading = tuple(shape[:-1])
+    bytes_row = shape[-1] * itemsize
+
+    ind_axis = 0
+    while ind_axis < len(shape_leading) - 1 and int(np.prod(shape_leading[ind_axis + 1:])) * bytes_row > max_bytes_block:
+        ind_axis += 1
+
+    bytes_inner = int(np.prod(shape_leading[ind_axis + 1:])) * bytes_row
+    num_block = max(1, max_bytes_block // bytes_inner)
+
+    if chunks is not None and num_block > chunks[ind_axis]:
+        num_block -= num_block % chunks[ind_axis]
+
+    for prefix in np.ndindex(*shape_leading[:ind_axis]):
+        for ind_start in range(0, shape_leading[ind_axis], num_block):
+            yield prefix + (slice(ind_start, ind_start + num_block), )
+
+def evaluate_metrics(values, weights):
+    # values: array-like of (..., num_wavelengths), including h5py datasets, which are read in blocks of at most max_bytes_block,
+    # so that every metric is computed in a single pass over values.
+    assert len(values.shape) >= 2
+    assert values.shape[-1] == weights.shape[0]
+
+    # wavelengths with zero weights for all metrics are dropped, so that values there never matter.
+    indices_not_zero = np.nonzero(np.any(weights != 0, axis=1))[0]
+    weights = weights[indices_not_zero]
+
+    metrics = np.zeros(tuple(values.shape[:-1]) + (weights.shape[1], ))
+
+    for key in get_keys_blocks(values.shape, np.dtype(values.dtype).itemsize, max_bytes_block, getattr(values, 'chunks', None)):
+        block = np.asarray(values[key])
+        block = block[..., indices_not_zero].astype(np.float64)
+
+        metrics[key] = block @ weights
+
+    return metrics
@@ -0,0 +1,218 @@
+import numpy as np
+import itertools
+import meep as mp
+
+
+def get_regions(material_indices, max_media=2):
+    # disjoint boxes, as tuples of slices, that cover an integer array and hold at most max_media distinct values each,
+    # found by merging slabs along an axis and splitting a slab along the next axis only if it holds more values,
+    # so that a design with a few materials is described by a few boxes regardless of its number of blocks.
+    assert isinstance(material_indices, np.ndarray)
+    assert max_media > 0
+
+    def split(box, axes, regions):
+        axis = axes[0]
+        ind_start = box[axis].start
+        media = set()
+
+        for ind in range(box[axis].start, box[axis].stop):
+            box_slab = box[:axis] + (slice(ind, ind + 1), ) + box[axis + 1:]
+            media_slab = set(np.unique(material_indices[box_slab]).tolist())
+
+            if len(media | media_slab) <= max_media:
+                media |= media_slab
+                continue
+
+            if ind > ind_start:
+                regions.append(box[:axis] + (slice(ind_start, ind), ) + box[axis + 1:])
+
+            if len(media_slab) <= max_media:
+                ind_start = ind
+                media = media_slab
+            else:
+                split(box_slab, axes[1:], regions)
+
+                ind_start = ind + 1
+                media = set()
+
+        if box[axis].stop > ind_start:
+            regions.append(box[:axis] + (slice(ind_start, box[axis].stop), ) + box[axis + 1:])
+
+    box = tuple([slice(0, size) for size in material_indices.shape])
+    regions_best = None
+
+    # every order of axes is tried, since layers along any axis are merged only if that axis is split last.
+    for axes in itertools.permutations(range(0, len(material_indices.shape))):
+        regions = []
+        split(box, list(axes), regions)
+
+        if regions_best is None or len(regions) < len(regions_best):
+            regions_best = regions
+
+    return regions_best
+
+def get_geometries_material_grids(material_indices, materials, index_air, size_material_block, num_voxels_block):
+    # material_indices: (num_x, num_y) or (num_x, num_y, num_z) along the axes of meep, centered at the origin,
+    # where a box with two media is a Block of a MaterialGrid, and a box with one medium is a plain Block.
+    assert len(material_indices.shape) in [2, 3]
+    assert num_voxels_block > 0
+
+    is_2d = len(material_indices.shape) == 2
+    shape = np.array(material_indices.shape)
+
+    geometries = []
+
+    for region in get_regions(material_indices):
+        values = material_indices[region]
+        media = np.unique(values)
+
+        starts = np.array([elem.start for elem in region])
+        stops = np.array([elem.stop for elem in region])
+
+        sizes = (stops - starts) * size_material_block
+        centers = (0.5 * (starts + stops) - 0.5 * shape) * size_material_block
+
+        size = mp.Vector3(sizes[0], sizes[1], mp.inf if is_2d else sizes[2])
+        center = mp.Vector3(centers[0], centers[1], 0 if is_2d else centers[2])
+
+        if media.shape[0] == 1:
+            if media[0] == index_air:
+                continue
+
+            material = materials[media[0]]
+        else:
+            # weights are repeated to the voxels of each block and not averaged, so that interfaces stay within a voxel.
+            weights = (values == media[1]).astype(np.float64)
+            for axis in range(0, len(weights.shape)):
+                weights = np.repeat(weights, num_voxels_block, axis=axis)
+
+            if is_2d:
+                weights = weights[..., np.newaxis]
+
+            material = mp.MaterialGrid(
+                mp.Vector3(*weights.shape),
+                materials[media[0]],
+                materials[media[1]],
+                weights=weights,
+                do_averaging=False,
+            )
+
+        geometries.append(mp.Block(size=size, center=center, material=material))
+
+    return geometries
+
+def to_array(vector):
+    return np.array([vector.x, vector.y, vector.z], dtype=np.float64)
+
+def get_basis_perpendicular(axis):
+    # two unit vectors perpendicular to a unit axis and to each other
+    vector = np.array([1.0, 0.0, 0.0]) if abs(axis[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+    first = np.cross(axis, vector)
+    first /= np.linalg.norm(first)
+
+    return first, np.cross(axis, first)
+
+def is_in_polygon(points, vertices):
+    # points: (num_points, 2), vertices: (num_vertices, 2), by counting crossings of rays along the first axis
+    is_inside = np.zeros(points.shape[0], dtype=bool)
+
+    for vertex_start, vertex_end in zip(vertices, np.roll(vertices, -1, axis=0)):
+        is_crossing = (vertex_start[1] > points[:, 1]) != (vertex_end[1] > points[:, 1])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_crossing = vertex_start[0] + (points[:, 1] - vertex_start[1]) * (vertex_end[0] - vertex_start[0]) / (vertex_end[1] - vertex_start[1])
+
+        is_inside ^= is_crossing & (points[:, 0] < x_crossing)
+
+    return is_inside
+
+def is_in_geometry(geometry, points):
+    # points: (num_points, 3), for the geometric objects used by structures
+    if isinstance(geometry, mp.Block):
+        basis = np.stack([
+            to_array(getattr(geometry, name, mp.Vector3(*elem)))
+            for name, elem in [('e1', (1, 0, 0)), ('e2', (0, 1, 0)), ('e3', (0, 0, 1))]
+        ], axis=1)
+        coordinates = np.linalg.solve(basis, (points - to_array(geometry.center)).T).T
+
+        return np.all(np.abs(coordinates) <= 0.5 * to_array(geometry.size), axis=1)
+    elif isinstance(geometry, mp.Sphere):
+        return np.sum((points - to_array(geometry.center))**2, axis=1) <= geometry.radius**2
+    elif isinstance(geometry, mp.Cylinder):
+        # a cone is a cylinder whose radius changes from radius at the bottom to radius2 at the top.
+        axis = to_array(geometry.axis) / np.linalg.norm(to_array(geometry.axis))
+        offsets = points - to_array(geometry.center)
+
+        heights = offsets @ axis
+        distances = np.linalg.norm(offsets - heights[:, np.newaxis] * axis[np.newaxis, :], axis=1)
+
+        radius2 = getattr(geometry, 'radius2', geometry.radius)
+        if np.isfinite(geometry.height) and geometry.height < mp.inf:
+            radii = geometry.radius + (radius2 - geometry.radius) * (heights / geometry.height + 0.5)
+        else:
+            radii = np.full(points.shape[0], geometry.radius)
+
+        return (np.abs(heights) <= 0.5 * geometry.height) & (distances <= radii)
+    elif isinstance(geometry, mp.Prism):
+        axis = to_array(geometry.axis) / np.linalg.norm(to_array(geometry.axis))
+        vertices = np.array([to_array(vertex) for vertex in geometry.vertices])
+        first, second = get_basis_perpendicular(axis)
+
+        # vertices lie on the bottom face, and a prism extends along its axis by its height.
+        heights = (points - vertices[0]) @ axis
+        is_in_face = is_in_polygon(
+            np.stack([points @ first, points @ second], axis=1),
+            np.stack([vertices @ first, vertices @ second], axis=1),
+        )
+
+        return (heights >= 0) & (heights <= geometry.height) & is_in_face
+    else:
+        raise ValueError(f'{type(geometry).__name__} is not rasterized')
+
+def get_labels_geometry(geometry, points, labels_materials):
+    material = geometry.material
+
+    if not isinstance(material, mp.MaterialGrid):
+        return np.full(points.shape[0], labels_materials[id(material)])
+
+    # a material grid spans its Block, and its weights are rounded to either medium, as in get_geometries_material_grids.
+    grid_size = np.maximum(np.round(to_array(material.grid_size)).astype(np.int64), 1)
+    weights = np.reshape(np.asarray(material.weights), tuple(grid_size))
+
+    sizes = to_array(geometry.size)
+    sizes[~np.isfinite(sizes) | (sizes >= mp.inf)] = 1.0
+    fractions = (points - to_array(geometry.center)) / sizes + 0.5
+    indices = np.clip(np.floor(fractions * grid_size).astype(np.int64), 0, grid_size - 1)
+
+    is_medium2 = weights[indices[:, 0], indices[:, 1], indices[:, 2]] >= 0.5
+
+    return np.where(is_medium2, labels_materials[id(material.medium2)], labels_materials[id(material.medium1)])
+
+def rasterize(geometries, labels_materials, label_default, size_cell, resolution, num_subpixels=1):
+    # labels of materials at num_subpixels points per voxel along each axis of a nonzero size, one slab along x at a time,
+    # where later geometric objects take precedence, as in meep, so that no meep object is initialized.
+    assert num_subpixels > 0
+
+    coordinates = []
+
+    for size in size_cell:
+        num_voxels = int(np.round(size * resolution))
+
+        if num_voxels == 0:
+            coordinates.append(np.zeros(1))
+        else:
+            coordinates.append(-0.5 * size + (np.arange(0, num_voxels * num_subpixels) + 0.5) / (num_subpixels * resolution))
+
+    coordinates_y, coordinates_z = np.meshgrid(coordinates[1], coordinates[2], indexing='ij')
+    coordinates_y = coordinates_y.ravel()
+    coordinates_z = coordinates_z.ravel()
+
+    for coordinate_x in coordinates[0]:
+        points = np.stack([np.full(coordinates_y.shape[0], coordinate_x), coordinates_y, coordinates_z], axis=1)
+        labels = np.full(points.shape[0], label_default, dtype=np.int16)
+
+        for geometry in geometries:
+            is_inside = is_in_geometry(geometry, points)
+            labels[is_inside] = get_labels_geometry(geometry, points[is_inside], labels_materials)
+
+        yield labels
@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class Grid:
+    # a Cartesian product of variable values, decoded from flat indices in the order of itertools.product
+
+    size_block = 4096
+
+    def __init__(self, all_variables):
+        assert isinstance(all_variables, list)
+        assert len(all_variables) > 0
+
+        self.all_variables = [np.asarray(variables) for variables in all_variables]
+
+        for variables in self.all_variables:
+            assert len(variables.shape) == 1
+            assert variables.shape[0] > 0
+
+        self.radices = np.array([variables.shape[0] for variables in self.all_variables], dtype=np.int64)
+        # the last variable varies fastest.
+        self.strides = np.concatenate([np.cumprod(self.radices[::-1])[::-1][1:], [1]]).astype(np.int64)
+
+        self.num_designs = int(np.prod(self.radices))
+        self.num_variables = len(self.all_variables)
+        self.dtype = np.result_type(*self.all_variables)
+
+    @property
+    def shape(self):
+        return (self.num_designs, self.num_variables)
+
+    def __len__(self):
+        return self.num_designs
+
+    def decode(self, indices):
+        indices = np.asarray(indices, dtype=np.int64)
+        assert np.all((indices >= 0) & (indices < self.num_designs))
+
+        digits = (indices[..., np.newaxis] // self.strides) % self.radices
+
+        designs = np.empty(digits.shape, dtype=self.dtype)
+        for ind_variable, variables in enumerate(self.all_variables):
+            designs[..., ind_variable] = variables[digits[..., ind_variable]]
+
+        return designs
+
+    def encode(self, designs):
+        designs = np.asarray(designs)
+        assert designs.shape[-1] == self.num_variables
+
+        indices = np.zeros(designs.shape[:-1], dtype=np.int64)
+
+        for ind_variable, variables in enumerate(self.all_variables):
+            digits = np.searchsorted(variables, designs[..., ind_variable])
+            assert np.all(variables[np.minimum(digits, variables.shape[0] - 1)] == designs[..., ind_variable])
+
+            indices += digits * self.strides[ind_variable]
+
+        return indices
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += self.num_designs
+            if not 0 <= key < self.num_designs:
+                raise IndexError
+
+            return self.decode(key)
+        elif isinstance(key, slice):
+            return self.decode(np.arange(*key.indices(self.num_designs)))
+        else:
+            indices = np.asarray(key)
+
+            if indices.dtype == bool:
+                assert indices.shape == (self.num_designs, )
+                indices = np.nonzero(indices)[0]
+
+            indices = np.where(indices < 0, indices + self.num_designs, indices)
+
+            return self.decode(indices)
+
+    def __iter__(self):
+        for ind_start in range(0, self.num_designs, self.size_block):
+            yield from self[ind_start:ind_start + self.size_block]
+
+    def __array__(self, dtype=None, copy=None):
+        designs = self[:]
+
+        if dtype is not None:
+            designs = designs.astype(dtype)
+
+        return designs
@@ -0,0 +1,185 @@
+import numpy as np
+import os
+import time
+import json
+import sqlite3
+import contextlib
+
+
+str_file_manifest = 'manifest.sqlite'
+# str_files per query, below the default limit of SQLite on the number of parameters
+size_batch = 500
+
+# databases whose schema this process has created, so that later instances only connect.
+paths_initialized = set()
+
+
+class Manifest:
+    def __init__(self, path_properties, timeout=60.0):
+        assert isinstance(path_properties, str)
+        assert isinstance(timeout, float)
+        assert timeout > 0
+
+        self.path_database = os.path.join(path_properties, str_file_manifest)
+        self.timeout = timeout
+
+        if self.path_database not in paths_initialized or not os.path.exists(self.path_database):
+            if not os.path.exists(path_properties):
+                os.makedirs(path_properties, exist_ok=True)
+
+            self.create()
+            paths_initialized.add(self.path_database)
+
+    def create(self):
+        with self.connect(True) as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'experiment TEXT NOT NULL, '
+                'name TEXT NOT NULL, '
+                'materials TEXT NOT NULL, '
+                'size_mesh REAL NOT NULL, '
+                'variables TEXT NOT NULL, '
+                'str_file TEXT NOT NULL, '
+                'format_properties TEXT NOT NULL, '
+                'time_saved REAL NOT NULL, '
+                'UNIQUE (experiment, str_file))'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS index_structure ON results (name, materials, size_mesh)')
+            # experiments whose results saved before the manifest existed have been indexed
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS experiments ('
+                'experiment TEXT PRIMARY KEY, '
+                'time_rebuilt REAL NOT NULL)'
+            )
+
+    @contextlib.contextmanager
+    def connect(self, is_write=False):
+        # writers from concurrent jobs are serialized by a write lock taken up front, and readers take no lock until they read.
+        connection = sqlite3.connect(self.path_database, timeout=self.timeout, isolation_level=None)
+
+        try:
+            connection.execute('BEGIN IMMEDIATE' if is_write else 'BEGIN DEFERRED')
+            yield connection
+            connection.execute('COMMIT')
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+    def get_rows(self, str_experiment, name, list_materials, size_mesh, list_variables, list_str_files, format_properties):
+        assert len(list_variables) == len(list_str_files)
+        assert format_properties in ['npy', 'hdf5']
+
+        str_materials = '_'.join(list_materials)
+        time_saved = time.time()
+
+        rows = [
+            (str_experiment, name, str_materials, float(size_mesh), json.dumps([float(elem) for elem in variables]), str_file, format_properties, time_saved)
+            for variables, str_file in zip(list_variables, list_str_files)
+        ]
+
+        return rows
+
+    def add(self, str_experiment, name, list_materials, size_mesh, list_variables, list_str_files, format_properties='npy'):
+        rows = self.get_rows(str_experiment, name, list_materials, size_mesh, list_variables, list_str_files, format_properties)
+
+        # a replaced result gets a new id, so that it is collected again.
+        with self.connect(True) as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO results '
+                '(experiment, name, materials, size_mesh, variables, str_file, format_properties, time_saved) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+
+    def get_str_files(self, str_experiment):
+        with self.connect() as connection:
+            rows = connection.execute(
+                'SELECT str_file FROM results WHERE experiment = ?', (str_experiment, )).fetchall()
+
+        return set([str_file for str_file, in rows])
+
+    def get_str_files_since(self, str_experiment, id_since, format_properties):
+        # results with ids larger than id_since, so that collectors resume from their last id
+        with self.connect() as connection:
+            rows = connection.execute(
+                'SELECT id, str_file FROM results WHERE experiment = ? AND format_properties = ? AND id > ? ORDER BY id',
+                (str_experiment, format_properties, id_since)
+            ).fetchall()
+
+        return rows
+
+    def get_variables(self, name, list_materials, size_mesh):
+        with self.connect() as connection:
+            rows = connection.execute(
+                'SELECT variables FROM results WHERE name = ? AND materials = ? AND size_mesh = ? ORDER BY variables',
+                (name, '_'.join(list_materials), float(size_mesh))
+            ).fetchall()
+
+        return np.array([json.loads(str_variables) for str_variables, in rows])
+
+    def contains(self, str_experiment, list_str_files):
+        # str_files are looked up in batches on the unique index of (experiment, str_file), so that a query touches only them.
+        str_files = set()
+
+        with self.connect() as connection:
+            for ind_start in range(0, len(list_str_files), size_batch):
+                batch = list(list_str_files[ind_start:ind_start + size_batch])
+                rows = connection.execute(
+                    f'SELECT str_file FROM results WHERE experiment = ? AND str_file IN ({", ".join(["?"] * len(batch))})',
+                    [str_experiment] + batch
+                ).fetchall()
+
+                str_files.update([str_file for str_file, in rows])
+
+        return np.array([str_file in str_files for str_file in list_str_files], dtype=bool)
+
+    def is_rebuilt(self, str_experiment):
+        with self.connect() as connection:
+            row = connection.execute(
+                'SELECT time_rebuilt FROM experiments WHERE experiment = ?', (str_experiment, )).fetchone()
+
+        return row is not None
+
+    def rebuild(self, str_experiment, name, list_materials, size_mesh, path_current, skip_if_rebuilt=False):
+        # results saved before the manifest existed are indexed with one directory listing,
+        # and an experiment is marked in the same transaction, so that it is indexed once regardless of rows saved since.
+        with self.connect(True) as connection:
+            if skip_if_rebuilt and connection.execute(
+                'SELECT time_rebuilt FROM experiments WHERE experiment = ?', (str_experiment, )).fetchone() is not None:
+                return 0
+
+            prefix = f'{str_experiment}_'
+
+            list_str_files = []
+            list_variables = []
+
+            if os.path.exists(path_current):
+                for str_file in os.listdir(path_current):
+                    if not (str_file.startswith(prefix) and str_file.endswith('.npy')):
+                        continue
+
+                    try:
+                        variables = [float(elem) for elem in str_file[len(prefix):-len('.npy')].split('_')]
+                    except ValueError:
+                        continue
+
+                    list_str_files.append(str_file)
+                    list_variables.append(variables)
+
+            rows = self.get_rows(str_experiment, name, list_materials, size_mesh, list_variables, list_str_files, 'npy')
+
+            # rows that are indexed already keep their ids, so that collectors do not collect them again.
+            connection.executemany(
+                'INSERT OR IGNORE INTO results '
+                '(experiment, name, materials, size_mesh, variables, str_file, format_properties, time_saved) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            connection.execute(
+                'INSERT OR REPLACE INTO experiments (experiment, time_rebuilt) VALUES (?, ?)', (str_experiment, time.time()))
+
+        return len(list_str_files)
@@ -1,3 +1,4 @@
+import numpy as np
 import math
 import meep as mp
 
@@ -57,3 +58,28 @@ def get_material(str_material):
         raise ValueError
 
     return material
+
+def compute_permittivities(str_material, frequencies):
+    assert isinstance(str_material, str)
+    assert isinstance(frequencies, np.ndarray)
+    assert len(frequencies.shape) == 1
+
+    material = get_material(str_material)
+    permittivities = material.epsilon_diag.x * np.ones(frequencies.shape[0], dtype=np.complex128)
+
+    for susceptibility in material.E_susceptibilities:
+        sigma = susceptibility.sigma_diag.x
+
+        if isinstance(susceptibility, mp.DrudeSusceptibility):
+            permittivities += sigma * susceptibility.frequency**2 / (
+                -frequencies**2 - 1j * frequencies * susceptibility.gamma)
+        elif isinstance(susceptibility, mp.LorentzianSusceptibility):
+            permittivities += sigma * susceptibility.frequency**2 / (
+                susceptibility.frequency**2 - frequencies**2 - 1j * frequencies * susceptibility.gamma)
+        else:
+            raise ValueError
+
+    conductivity = material.D_conductivity_diag.x
+    permittivities *= 1.0 + 1j * conductivity / (2 * math.pi * frequencies)
+
+    return permittivities
@@ -38,7 +38,7 @@ def evaluate_continuous(bx, str_structure, model):
     else:
         return -1.0 * evaluation
 
-def evaluate_direct(bx, str_structure, ind_materials, str_fidelity, str_property):
+def evaluate_direct(bx, str_structure, ind_materials, str_fidelity, str_property, run_concurrently=False):
     assert isinstance(str_structure, str)
     assert isinstance(ind_materials, int)
     assert isinstance(str_fidelity, str)
@@ -57,8 +57,13 @@ def evaluate_direct(bx, str_structure, ind_materials, str_fidelity, str_property
         save_figures=False,
         save_properties=False,
         save_efields_hfields=False,
+        run_concurrently=run_concurrently,
     )
 
+    if not obj.is_feasible(bx[np.newaxis, ...])[0]:
+        # an infeasible design gets the worst objective, since objectives are within [-1, 1].
+        return 1.0
+
     dict_all = obj.run(bx)
     wavelengths = dict_all['wavelengths']
     values = np.array([dict_all[str_property]])
@@ -0,0 +1,189 @@
+import os
+import time
+import json
+import sqlite3
+import threading
+import contextlib
+
+
+class JobQueue:
+    def __init__(self, path_database, duration_lease=600.0, max_attempts=3, timeout=60.0):
+        assert isinstance(path_database, str)
+        assert isinstance(duration_lease, float)
+        assert isinstance(max_attempts, int)
+        assert isinstance(timeout, float)
+        assert duration_lease > 0
+        assert max_attempts > 0
+        assert timeout > 0
+
+        self.path_database = path_database
+        self.duration_lease = duration_lease
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+        path_directory = os.path.dirname(os.path.abspath(path_database))
+        if not os.path.exists(path_directory):
+            os.makedirs(path_directory, exist_ok=True)
+
+        with self.connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id INTEGER PRIMARY KEY, '
+                'variables TEXT UNIQUE NOT NULL, '
+                'status TEXT NOT NULL, '
+                'worker TEXT, '
+                'time_heartbeat REAL, '
+                'num_attempts INTEGER NOT NULL)'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS failures ('
+                'id_job INTEGER NOT NULL, '
+                'worker TEXT, '
+                'time_failure REAL NOT NULL, '
+                'error TEXT)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS index_status ON jobs (status)')
+
+    @contextlib.contextmanager
+    def connect(self):
+        # every transaction takes a write lock up front, so that workers never lease the same job.
+        connection = sqlite3.connect(self.path_database, timeout=self.timeout, isolation_level=None)
+
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            yield connection
+            connection.execute('COMMIT')
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+    def add(self, list_variables):
+        rows = [(json.dumps([int(elem) for elem in variables]), ) for variables in list_variables]
+
+        with self.connect() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO jobs (variables, status, num_attempts) VALUES (?, 'pending', 0)", rows)
+
+    def reclaim(self, connection, time_current):
+        rows = connection.execute(
+            "SELECT id, worker, num_attempts FROM jobs WHERE status = 'leased' AND time_heartbeat < ?",
+            (time_current - self.duration_lease, )
+        ).fetchall()
+
+        for id_job, worker, num_attempts in rows:
+            self.record_failure(connection, id_job, worker, num_attempts, 'lease expired', time_current)
+
+    def record_failure(self, connection, id_job, worker, num_attempts, error, time_current):
+        connection.execute(
+            'INSERT INTO failures (id_job, worker, time_failure, error) VALUES (?, ?, ?, ?)',
+            (id_job, worker, time_current, error)
+        )
+        connection.execute(
+            'UPDATE jobs SET status = ?, worker = NULL, time_heartbeat = NULL WHERE id = ?',
+            ('failed' if num_attempts >= self.max_attempts else 'pending', id_job)
+        )
+
+    def acquire(self, worker):
+        assert isinstance(worker, str)
+
+        time_current = time.time()
+
+        with self.connect() as connection:
+            self.reclaim(connection, time_current)
+
+            row = connection.execute(
+                "SELECT id, variables FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1").fetchone()
+
+            if row is None:
+                return None
+
+            id_job, str_variables = row
+            connection.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, time_heartbeat = ?, num_attempts = num_attempts + 1 "
+                'WHERE id = ?',
+                (worker, time_current, id_job)
+            )
+
+        return id_job, json.loads(str_variables)
+
+    def heartbeat(self, id_job, worker):
+        with self.connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET time_heartbeat = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time(), id_job, worker)
+            )
+
+        return cursor.rowcount == 1
+
+    def complete(self, id_job, worker):
+        with self.connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = 'done', time_heartbeat = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time(), id_job, worker)
+            )
+
+        return cursor.rowcount == 1
+
+    def fail(self, id_job, worker, error):
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT num_attempts FROM jobs WHERE id = ? AND worker = ? AND status = 'leased'",
+                (id_job, worker)
+            ).fetchone()
+
+            if row is None:
+                return False
+
+            self.record_failure(connection, id_job, worker, row[0], error, time.time())
+
+        return True
+
+    def reset_failed(self):
+        with self.connect() as connection:
+            connection.execute("UPDATE jobs SET status = 'pending', num_attempts = 0 WHERE status = 'failed'")
+
+    def count(self):
+        with self.connect() as connection:
+            rows = connection.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+
+        return counts
+
+    def get_failures(self):
+        with self.connect() as connection:
+            rows = connection.execute(
+                'SELECT jobs.variables, failures.worker, failures.time_failure, failures.error '
+                'FROM failures JOIN jobs ON failures.id_job = jobs.id ORDER BY failures.time_failure'
+            ).fetchall()
+
+        return [(json.loads(str_variables), worker, time_failure, error) for str_variables, worker, time_failure, error in rows]
+
+
+class Heartbeat:
+    def __init__(self, queue, id_job, worker):
+        self.queue = queue
+        self.id_job = id_job
+        self.worker = worker
+
+        self.event_stop = threading.Event()
+        self.thread = threading.Thread(target=self.beat, daemon=True)
+
+    def beat(self):
+        while not self.event_stop.wait(self.queue.duration_lease / 3):
+            try:
+                self.queue.heartbeat(self.id_job, self.worker)
+            except sqlite3.OperationalError:
+                pass
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.event_stop.set()
+        self.thread.join()
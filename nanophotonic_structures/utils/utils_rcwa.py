@@ -0,0 +1,189 @@
+import numpy as np
+
+
+def get_eigenvalues_homogeneous(permittivities, wave_vectors_x):
+    # permittivities: (num_frequencies, ), wave_vectors_x: (num_frequencies, num_harmonics)
+    eigenvalues = np.sqrt(wave_vectors_x**2 - permittivities[:, np.newaxis] + 0j)
+    eigenvalues = np.where(np.real(eigenvalues) < 0, -eigenvalues, eigenvalues)
+
+    return eigenvalues
+
+def compute_fourier_coefficients(segments, period, order):
+    # segments: list of (x_start, x_end), in units of unit_length and within [-period / 2, period / 2]
+    # returns (num_segments, 4 * order + 1) coefficients of the indicator functions
+
+    harmonics = np.arange(-2 * order, 2 * order + 1)
+    coefficients = np.zeros((len(segments), harmonics.shape[0]), dtype=np.complex128)
+
+    for ind_segment, (x_start, x_end) in enumerate(segments):
+        assert x_start <= x_end
+
+        coefficients[ind_segment, harmonics == 0] = (x_end - x_start) / period
+
+        harmonics_ = harmonics[harmonics != 0]
+        coefficients[ind_segment, harmonics != 0] = (
+            np.exp(-2j * np.pi * harmonics_ * x_end / period) - np.exp(-2j * np.pi * harmonics_ * x_start / period)
+        ) / (-2j * np.pi * harmonics_)
+
+    return coefficients
+
+def get_convolution_matrices(permittivities_background, segments, permittivities_segments, period, order):
+    # permittivities_background: (num_frequencies, ), permittivities_segments: (num_segments, num_frequencies)
+    # returns (num_frequencies, num_harmonics, num_harmonics)
+
+    num_harmonics = 2 * order + 1
+    num_frequencies = permittivities_background.shape[0]
+
+    coefficients = np.zeros((num_frequencies, 4 * order + 1), dtype=np.complex128)
+    coefficients[:, 2 * order] = permittivities_background
+
+    if len(segments) > 0:
+        coefficients_segments = compute_fourier_coefficients(segments, period, order)
+        coefficients += np.einsum(
+            'sf,sh->fh',
+            permittivities_segments - permittivities_background[np.newaxis, :],
+            coefficients_segments
+        )
+
+    indices = np.arange(0, num_harmonics)
+    indices = indices[:, np.newaxis] - indices[np.newaxis, :] + 2 * order
+
+    return coefficients[:, indices]
+
+def star(S11_a, S12_a, S21_a, S22_a, S11_b, S12_b, S21_b, S22_b):
+    identity = np.eye(S11_a.shape[-1])[np.newaxis, ...]
+
+    D = np.swapaxes(np.linalg.solve(
+        np.swapaxes(identity - S11_b @ S22_a, -1, -2),
+        np.swapaxes(S12_a, -1, -2)
+    ), -1, -2)
+    F = np.swapaxes(np.linalg.solve(
+        np.swapaxes(identity - S22_a @ S11_b, -1, -2),
+        np.swapaxes(S21_b, -1, -2)
+    ), -1, -2)
+
+    S11 = S11_a + D @ S11_b @ S21_a
+    S12 = D @ S12_b
+    S21 = F @ S21_a
+    S22 = S22_b + F @ S22_a @ S12_b
+
+    return S11, S12, S21, S22
+
+def compute_scattering_matrix_layer(convolution_matrices, wave_vectors_x, frequencies, thickness):
+    num_frequencies, num_harmonics, _ = convolution_matrices.shape
+    identity = np.eye(num_harmonics)[np.newaxis, ...]
+
+    omegas = np.einsum('fh,hk->fhk', wave_vectors_x**2, np.eye(num_harmonics)) - convolution_matrices
+    eigenvalues, W = np.linalg.eig(omegas)
+    eigenvalues = np.sqrt(eigenvalues + 0j)
+    eigenvalues = np.where(np.real(eigenvalues) < 0, -eigenvalues, eigenvalues)
+
+    V = W * eigenvalues[:, np.newaxis, :]
+
+    # the gap medium is a zero-thickness medium with W_0 = I and V_0 = 1j * I.
+    W_inv = np.linalg.inv(W)
+    V_inv = np.linalg.inv(V)
+
+    A = W_inv + V_inv * 1j
+    B = W_inv - V_inv * 1j
+
+    X = np.exp(-eigenvalues * 2 * np.pi * frequencies[:, np.newaxis] * thickness)
+    X = X[:, :, np.newaxis] * identity
+
+    A_inv = np.linalg.inv(A)
+    XB = X @ B
+    D = A - XB @ A_inv @ XB
+
+    S11 = np.linalg.solve(D, XB @ A_inv @ X @ A - B)
+    S12 = np.linalg.solve(D, X @ (A - B @ A_inv @ B))
+
+    return S11, S12, S12.copy(), S11.copy()
+
+def compute_scattering_matrix_homogeneous(eigenvalues, is_reflection):
+    # W = I and V = eigenvalues for homogeneous media; the gap medium has W_0 = I and V_0 = 1j * I.
+    num_harmonics = eigenvalues.shape[-1]
+    identity = np.eye(num_harmonics)[np.newaxis, ...]
+
+    ratios = eigenvalues / 1j
+
+    A = (1 + ratios)[:, :, np.newaxis] * identity
+    B = (1 - ratios)[:, :, np.newaxis] * identity
+    A_inv = (1 / (1 + ratios))[:, :, np.newaxis] * identity
+
+    if is_reflection:
+        S11 = -A_inv @ B
+        S12 = 2 * A_inv
+        S21 = 0.5 * (A - B @ A_inv @ B)
+        S22 = B @ A_inv
+    else:
+        S11 = B @ A_inv
+        S12 = 0.5 * (A - B @ A_inv @ B)
+        S21 = 2 * A_inv
+        S22 = -A_inv @ B
+
+    return S11, S12, S21, S22
+
+def compute_transmittance_reflectance(
+    frequencies, period, layers, order,
+    permittivity_incidence=1.0, permittivity_exit=1.0
+):
+    # frequencies: (num_frequencies, ), in units of 1 / unit_length
+    # period: a period along x, in units of unit_length
+    # layers: list of (thickness, permittivities_background, segments, permittivities_segments),
+    #     ordered along the propagation direction, with permittivities in the convention of meep
+    # order: a Fourier order, which uses 2 * order + 1 harmonics
+
+    assert isinstance(frequencies, np.ndarray)
+    assert isinstance(layers, list)
+    assert isinstance(order, int)
+    assert len(frequencies.shape) == 1
+    assert period > 0
+    assert order >= 0
+
+    num_frequencies = frequencies.shape[0]
+    num_harmonics = 2 * order + 1
+    harmonics = np.arange(-order, order + 1)
+
+    # it follows the exp(+jwt) convention of RCWA, so that permittivities are conjugated.
+    permittivities_incidence = np.conj(permittivity_incidence * np.ones(num_frequencies, dtype=np.complex128))
+    permittivities_exit = np.conj(permittivity_exit * np.ones(num_frequencies, dtype=np.complex128))
+
+    wave_vectors_x = -harmonics[np.newaxis, :] / (period * frequencies[:, np.newaxis])
+    wave_vectors_x = wave_vectors_x.astype(np.complex128)
+
+    eigenvalues_incidence = get_eigenvalues_homogeneous(permittivities_incidence, wave_vectors_x)
+    eigenvalues_exit = get_eigenvalues_homogeneous(permittivities_exit, wave_vectors_x)
+
+    S = compute_scattering_matrix_homogeneous(eigenvalues_incidence, True)
+
+    for thickness, permittivities_background, segments, permittivities_segments in layers:
+        if thickness <= 0:
+            continue
+
+        convolution_matrices = get_convolution_matrices(
+            np.conj(permittivities_background),
+            segments,
+            np.conj(np.array(permittivities_segments)).reshape(len(segments), num_frequencies),
+            period,
+            order
+        )
+        S_layer = compute_scattering_matrix_layer(convolution_matrices, wave_vectors_x, frequencies, thickness)
+        S = star(*S, *S_layer)
+
+    S = star(*S, *compute_scattering_matrix_homogeneous(eigenvalues_exit, False))
+
+    sources = np.zeros((num_frequencies, num_harmonics), dtype=np.complex128)
+    sources[:, order] = 1.0
+
+    coefficients_reflection = np.einsum('fhk,fk->fh', S[0], sources)
+    coefficients_transmission = np.einsum('fhk,fk->fh', S[2], sources)
+
+    # longitudinal wave vectors are -1j * eigenvalues, so that their real parts are the imaginary parts of eigenvalues.
+    wave_vectors_incidence = np.imag(eigenvalues_incidence[:, order])
+
+    reflectance = np.sum(
+        np.abs(coefficients_reflection)**2 * np.imag(eigenvalues_incidence), axis=1) / wave_vectors_incidence
+    transmittance = np.sum(
+        np.abs(coefficients_transmission)**2 * np.imag(eigenvalues_exit), axis=1) / wave_vectors_incidence
+
+    return transmittance, reflectance
@@ -0,0 +1,168 @@
+import numpy as np
+import scipy.linalg
+
+
+# the degree stops increasing once errors have not decreased for this many steps, i.e., at a noise floor.
+num_steps_stagnation = 3
+
+
+def get_cauchy(points, points_support):
+    # rows of support points are undefined, but they are excluded or replaced by callers.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 1.0 / (points[:, np.newaxis] - points_support[np.newaxis, :])
+
+def compute_weights(points, values, indices_support):
+    # weights minimizing a linearized residual at points other than support points
+    is_not_support = np.ones(points.shape[0], dtype=bool)
+    is_not_support[indices_support] = False
+
+    cauchy = get_cauchy(points[is_not_support], points[indices_support])
+    loewner = values[is_not_support][:, np.newaxis] * cauchy - cauchy * values[indices_support][np.newaxis, :]
+
+    if loewner.shape[0] == 0:
+        return np.ones(len(indices_support), dtype=np.complex128) / np.sqrt(len(indices_support))
+
+    _, _, Vh = np.linalg.svd(loewner, full_matrices=True)
+
+    return np.conj(Vh[-1])
+
+def compute_poles_residues(points_support, values_support, weights):
+    # poles are finite eigenvalues of an arrowhead pencil, as in Nakatsukasa, Sete, and Trefethen (2018).
+    num_support = points_support.shape[0]
+
+    if num_support < 2:
+        return np.zeros(0, dtype=np.complex128), np.zeros(0, dtype=np.complex128)
+
+    matrix_left = np.zeros((num_support + 1, num_support + 1), dtype=np.complex128)
+    matrix_left[0, 1:] = weights
+    matrix_left[1:, 0] = 1.0
+    matrix_left[1:, 1:] = np.diag(points_support)
+
+    matrix_right = np.eye(num_support + 1, dtype=np.complex128)
+    matrix_right[0, 0] = 0.0
+
+    poles = scipy.linalg.eigvals(matrix_left, matrix_right)
+    poles = poles[np.isfinite(poles)]
+
+    # residues are numerators over derivatives of denominators at poles.
+    cauchy = get_cauchy(poles, points_support)
+    residues = (cauchy @ (weights * values_support)) / (-1.0 * (cauchy**2 @ weights))
+
+    return poles, residues
+
+def clean_up_aaa(points, values, indices_support, weights, tolerance_cleanup):
+    # spurious poles, i.e., Froissart doublets, have residues below a noise level,
+    # so that the support points nearest to them are removed and weights are fitted again.
+    poles, residues = compute_poles_residues(points[indices_support], values[indices_support], weights)
+    is_spurious = np.abs(residues) < tolerance_cleanup
+
+    if not np.any(is_spurious):
+        return indices_support, weights
+
+    indices_removed = set()
+    for pole in poles[is_spurious]:
+        indices_removed.add(indices_support[int(np.argmin(np.abs(points[indices_support] - pole)))])
+
+    indices_support = [ind for ind in indices_support if ind not in indices_removed]
+
+    if len(indices_support) == 0:
+        indices_support = [int(np.argmax(np.abs(values)))]
+
+    return indices_support, compute_weights(points, values, indices_support)
+
+def fit_aaa(points, values, tolerance, max_degree=None):
+    # the AAA algorithm by Nakatsukasa, Sete, and Trefethen (2018)
+    assert isinstance(points, np.ndarray)
+    assert isinstance(values, np.ndarray)
+    assert len(points.shape) == 1
+    assert points.shape == values.shape
+
+    num_points = points.shape[0]
+
+    if max_degree is None:
+        max_degree = num_points // 2
+
+    points = points.astype(np.complex128)
+    values = values.astype(np.complex128)
+
+    scale = np.max(np.abs(values))
+    if scale == 0:
+        return points[:1], values[:1], np.ones(1, dtype=np.complex128)
+
+    is_not_support = np.ones(num_points, dtype=bool)
+    indices_support = []
+
+    approximations = np.full(num_points, np.mean(values))
+
+    error_best = np.inf
+    indices_support_best = None
+    weights_best = None
+    num_steps_since_best = 0
+
+    for _ in range(0, max_degree + 1):
+        errors = np.abs(values - approximations)
+        errors[~is_not_support] = -np.inf
+        ind = int(np.argmax(errors))
+
+        indices_support.append(ind)
+        is_not_support[ind] = False
+
+        weights = compute_weights(points, values, indices_support)
+
+        cauchy = get_cauchy(points[is_not_support], points[indices_support])
+        approximations = values.copy()
+        approximations[is_not_support] = (cauchy @ (weights * values[indices_support])) / (cauchy @ weights)
+
+        error = np.max(np.abs(values - approximations))
+
+        if error < error_best:
+            error_best = error
+            indices_support_best = list(indices_support)
+            weights_best = weights
+            num_steps_since_best = 0
+        else:
+            num_steps_since_best += 1
+
+        if error <= tolerance * scale or np.sum(is_not_support) <= len(indices_support) or num_steps_since_best >= num_steps_stagnation:
+            break
+
+    indices_support, weights = clean_up_aaa(points, values, indices_support_best, weights_best, tolerance * scale)
+
+    return points[indices_support], values[indices_support], weights
+
+def evaluate_aaa(points_support, values_support, weights, points):
+    points = points.astype(np.complex128)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cauchy = 1.0 / (points[:, np.newaxis] - points_support[np.newaxis, :])
+        values = (cauchy @ (weights * values_support)) / (cauchy @ weights)
+
+    # it uses values at support points directly, where the barycentric formula is undefined.
+    indices_nan, indices_support = np.nonzero(points[:, np.newaxis] == points_support[np.newaxis, :])
+    values[indices_nan] = values_support[indices_support]
+
+    return values
+
+def reconstruct(frequencies_monitored, values_monitored, frequencies, tolerance):
+    assert isinstance(frequencies_monitored, np.ndarray)
+    assert isinstance(values_monitored, np.ndarray)
+    assert isinstance(frequencies, np.ndarray)
+    assert frequencies_monitored.shape == values_monitored.shape
+
+    scale = np.max(np.abs(values_monitored))
+
+    # a reconstruction error is estimated on held-out frequencies, fitting every other frequency.
+    points_support, values_support, weights = fit_aaa(
+        frequencies_monitored[::2], values_monitored[::2], tolerance)
+    values_held_out = evaluate_aaa(points_support, values_support, weights, frequencies_monitored[1::2])
+
+    if scale > 0:
+        error = np.max(np.abs(np.real(values_held_out) - values_monitored[1::2])) / scale
+    else:
+        error = 0.0
+
+    points_support, values_support, weights = fit_aaa(
+        frequencies_monitored, values_monitored, tolerance)
+    values = np.real(evaluate_aaa(points_support, values_support, weights, frequencies))
+
+    return values, error
@@ -1,12 +1,13 @@
 import numpy as np
-import pvlib.spectrum as pvs
 
+from nanophotonic_structures.utils import utils_efficiency
+from nanophotonic_structures.utils import utils_spectra
 
-def compute_efficiency(wavelengths, values, str_material=None):
-    assert len(wavelengths.shape) == 1
-    assert len(values.shape) == 1
-    assert wavelengths.shape[0] == values.shape[0]
 
+weights_cached = {}
+
+
+def get_cutoff_wavelength(str_material):
     if str_material is None:
         cutoff_wavelength = np.inf
     elif str_material == 'cSi':
@@ -18,6 +19,15 @@ def compute_efficiency(wavelengths, values, str_material=None):
     else:
         raise ValueError
 
+    return cutoff_wavelength
+
+def compute_efficiency(wavelengths, values, str_material=None):
+    assert len(wavelengths.shape) == 1
+    assert len(values.shape) == 1
+    assert wavelengths.shape[0] == values.shape[0]
+
+    cutoff_wavelength = get_cutoff_wavelength(str_material)
+
     indices = np.argsort(wavelengths)
 
     wavelengths = wavelengths[indices]
@@ -25,7 +35,7 @@ def compute_efficiency(wavelengths, values, str_material=None):
 
     values[wavelengths > cutoff_wavelength] = 0.0
 
-    am15g = pvs.get_am15g(wavelengths).to_numpy()
+    am15g = utils_spectra.get_intensities('AM1.5G', wavelengths)
     am15g_ = am15g * values
 
     numerator = (0.5 * (am15g_[1:] + am15g_[:-1])) * (wavelengths[1:] - wavelengths[:-1])
@@ -39,6 +49,16 @@ def compute_efficiency(wavelengths, values, str_material=None):
 
     return efficiency
 
+def get_weights(wavelengths, str_material=None):
+    # weights are computed once per wavelength grid and cutoff, so that efficiencies of many spectra are a product.
+    key = (wavelengths.astype(np.float64).tobytes(), str_material)
+
+    if key not in weights_cached:
+        weights_cached[key] = utils_efficiency.compute_weights(
+            wavelengths, utils_spectra.get_intensities('AM1.5G', wavelengths), get_cutoff_wavelength(str_material))
+
+    return weights_cached[key]
+
 def compute_efficiencies(wavelengths, values, materials):
     assert len(wavelengths.shape) == 1
     assert wavelengths.shape[0] == values.shape[-1]
@@ -54,24 +74,4 @@ def compute_efficiencies(wavelengths, values, materials):
     else:
         str_mat = None
 
-    shape_values = values.shape
-    if len(shape_values) > 2:
-        values = np.reshape(
-            values,
-            (-1, shape_values[-1]),
-            order='C'
-        )
-
-    new_values = []
-    for elem in values:
-        new_values.append(compute_efficiency(wavelengths, elem, str_mat))
-    values = np.array(new_values)
-
-    if len(shape_values) > 2:
-        values = np.reshape(
-            values,
-            shape_values[:-1],
-            order='C'
-        )
-
-    return values
+    return utils_efficiency.apply_weights(values, get_weights(wavelengths, str_mat))
@@ -0,0 +1,107 @@
+import numpy as np
+import os
+import csv
+
+
+# reference spectra are package data, so that they do not depend on a working directory.
+path_spectra_package = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'spectra')
+# CSV files exist only in a source checkout, and spectra built from them are written to a user cache, not to the package.
+path_spectra_csv = os.path.join(os.path.dirname(os.path.dirname(path_spectra_package)), 'spectra')
+path_spectra_cache = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')), 'nanophotonic_structures', 'spectra')
+
+files_csv = {
+    'C': 'CIE_illum_C.csv',
+    'D50': 'CIE_std_illum_D50.csv',
+    'D55': 'CIE_illum_D55.csv',
+    'D65': 'CIE_std_illum_D65.csv',
+    'D75': 'CIE_illum_D75.csv',
+}
+names_spectra = ['AM1.5G'] + list(files_csv.keys())
+
+spectra_cached = {}
+intensities_cached = {}
+
+
+def get_path_spectrum(str_spectrum, path_spectra=path_spectra_package):
+    return os.path.join(path_spectra, f'{str_spectrum}.npy')
+
+def build_spectrum(str_spectrum):
+    # it returns (num_wavelengths, 2) of wavelengths in nm and intensities, sorted by wavelengths.
+    if str_spectrum == 'AM1.5G':
+        # pvlib, and pandas with it, are imported only when the binary spectrum is missing.
+        import pvlib.spectrum as pvs
+
+        # the global tilt column of ASTM G173-03, which get_am15g returned before pvlib 0.11
+        if hasattr(pvs, 'get_reference_spectra'):
+            am15g = pvs.get_reference_spectra(standard='ASTM G173-03')['global']
+        else:
+            am15g = pvs.get_am15g()
+
+        data = np.stack([am15g.index.to_numpy(dtype=np.float64), am15g.to_numpy(dtype=np.float64)], axis=1)
+    elif str_spectrum in files_csv:
+        path_csv = os.path.join(path_spectra_csv, files_csv[str_spectrum])
+        if not os.path.exists(path_csv):
+            raise FileNotFoundError(f'{str_spectrum}.npy is not in {path_spectra_package}, and {path_csv} does not exist')
+
+        with open(path_csv) as file_csv:
+            data = np.array([row for row in csv.reader(file_csv, delimiter=',')]).astype(np.float64)
+    else:
+        raise ValueError
+
+    return data[np.argsort(data[:, 0])]
+
+def get_spectrum(str_spectrum):
+    assert str_spectrum in names_spectra
+
+    if str_spectrum not in spectra_cached:
+        path_spectrum = get_path_spectrum(str_spectrum)
+        path_spectrum_cache = get_path_spectrum(str_spectrum, path_spectra_cache)
+
+        if os.path.exists(path_spectrum):
+            data = np.load(path_spectrum)
+        elif os.path.exists(path_spectrum_cache):
+            data = np.load(path_spectrum_cache)
+        else:
+            data = build_spectrum(str_spectrum)
+
+            # a binary spectrum missing from the package is written to a user cache once, if the cache is writable.
+            try:
+                os.makedirs(path_spectra_cache, exist_ok=True)
+                path_temporary = f'{path_spectrum_cache}.{os.getpid()}.tmp'
+
+                with open(path_temporary, 'wb') as file_spectrum:
+                    np.save(file_spectrum, data)
+                os.replace(path_temporary, path_spectrum_cache)
+            except OSError:
+                pass
+
+        spectra_cached[str_spectrum] = data
+
+    return spectra_cached[str_spectrum]
+
+def get_intensities(str_spectrum, wavelengths):
+    # intensities resampled linearly at wavelengths in nm, memoized per wavelength grid
+    assert isinstance(wavelengths, np.ndarray)
+    assert len(wavelengths.shape) == 1
+
+    wavelengths = wavelengths.astype(np.float64)
+    key = (str_spectrum, wavelengths.tobytes())
+
+    if key not in intensities_cached:
+        data = get_spectrum(str_spectrum)
+
+        if str_spectrum == 'AM1.5G':
+            # AM1.5G is zero outside its table, as in pvlib.
+            intensities = np.interp(wavelengths, data[:, 0], data[:, 1], left=0.0, right=0.0)
+        else:
+            # CIE illuminants are not extrapolated, as in scipy.interpolate.interp1d.
+            if np.any(wavelengths < data[0, 0]) or np.any(wavelengths > data[-1, 0]):
+                raise ValueError(f'wavelengths are outside the range of {str_spectrum}')
+
+            intensities = np.interp(wavelengths, data[:, 0], data[:, 1])
+
+        intensities.flags.writeable = False
+        intensities_cached[key] = intensities
+
+    return intensities_cached[key]
@@ -3,8 +3,12 @@ import os
 import csv
 import scipy.interpolate as sciip
 
+from nanophotonic_structures.utils import utils_efficiency
+from nanophotonic_structures.utils import utils_spectra
 
-path_spectra = '../spectra'
+
+path_spectra = utils_spectra.path_spectra_csv
+weights_cached = {}
 
 def load_csv(str_file_csv, path_spectra=path_spectra):
     with open(os.path.join(path_spectra, str_file_csv)) as file_csv:
@@ -17,21 +21,11 @@ def load_csv(str_file_csv, path_spectra=path_spectra):
     data = np.array(data).astype(np.float64)
     return data
 
-def get_model_interpolation(str_standard_illuminant, path_spectra=path_spectra):
-    if str_standard_illuminant == 'C':
-        str_file_csv = 'CIE_illum_C.csv'
-    elif str_standard_illuminant == 'D50':
-        str_file_csv = 'CIE_std_illum_D50.csv'
-    elif str_standard_illuminant == 'D55':
-        str_file_csv = 'CIE_illum_D55.csv'
-    elif str_standard_illuminant == 'D65':
-        str_file_csv = 'CIE_std_illum_D65.csv'
-    elif str_standard_illuminant == 'D75':
-        str_file_csv = 'CIE_illum_D75.csv'
-    else:
+def get_model_interpolation(str_standard_illuminant):
+    if str_standard_illuminant not in utils_spectra.files_csv:
         raise ValueError
 
-    data = load_csv(str_file_csv, path_spectra=path_spectra)
+    data = utils_spectra.get_spectrum(str_standard_illuminant)
     model_interpolation = sciip.interp1d(data[:, 0], data[:, 1], kind='linear')
 
     return model_interpolation
@@ -62,51 +56,38 @@ def compute_efficiency(wavelengths, values, intensities):
 
     return efficiency
 
+def get_weights(wavelengths, str_standard_illuminant='D65'):
+    # weights are computed once per wavelength grid and illuminant, so that efficiencies of many spectra are a product.
+    key = (wavelengths.astype(np.float64).tobytes(), str_standard_illuminant)
+
+    if key not in weights_cached:
+        weights_cached[key] = utils_efficiency.compute_weights(
+            wavelengths, utils_spectra.get_intensities(str_standard_illuminant, wavelengths))
+
+    return weights_cached[key]
+
 def compute_efficiencies(wavelengths, values, str_standard_illuminant='D65'):
     assert len(wavelengths.shape) == 1
     assert wavelengths.shape[0] == values.shape[-1]
     assert str_standard_illuminant in ['C', 'D50', 'D55', 'D65', 'D75']
 
-    model_interpolation = get_model_interpolation(str_standard_illuminant)
-    intensities = model_interpolation(wavelengths)
-
-    shape_values = values.shape
-    if len(shape_values) > 2:
-        values = np.reshape(
-            values,
-            (-1, shape_values[-1]),
-            order='C'
-        )
-
-    new_values = []
-    for elem in values:
-        new_values.append(compute_efficiency(wavelengths, elem, intensities))
-    values = np.array(new_values)
-
-    if len(shape_values) > 2:
-        values = np.reshape(
-            values,
-            shape_values[:-1],
-            order='C'
-        )
-
-    return values
+    return utils_efficiency.apply_weights(values, get_weights(wavelengths, str_standard_illuminant))
 
 
 if __name__ == '__main__':
     import matplotlib.pyplot as plt
 
-    data_c = load_csv('CIE_illum_C.csv', path_spectra='../../spectra')
-    data_d50 = load_csv('CIE_std_illum_D50.csv', path_spectra='../../spectra')
-    data_d55 = load_csv('CIE_illum_D55.csv', path_spectra='../../spectra')
-    data_d65 = load_csv('CIE_std_illum_D65.csv', path_spectra='../../spectra')
-    data_d75 = load_csv('CIE_illum_D75.csv', path_spectra='../../spectra')
-
-    model_interpolation_c = get_model_interpolation('C', path_spectra='../../spectra')
-    model_interpolation_d50 = get_model_interpolation('D50', path_spectra='../../spectra')
-    model_interpolation_d55 = get_model_interpolation('D55', path_spectra='../../spectra')
-    model_interpolation_d65 = get_model_interpolation('D65', path_spectra='../../spectra')
-    model_interpolation_d75 = get_model_interpolation('D75', path_spectra='../../spectra')
+    data_c = load_csv('CIE_illum_C.csv')
+    data_d50 = load_csv('CIE_std_illum_D50.csv')
+    data_d55 = load_csv('CIE_illum_D55.csv')
+    data_d65 = load_csv('CIE_std_illum_D65.csv')
+    data_d75 = load_csv('CIE_illum_D75.csv')
+
+    model_interpolation_c = get_model_interpolation('C')
+    model_interpolation_d50 = get_model_interpolation('D50')
+    model_interpolation_d55 = get_model_interpolation('D55')
+    model_interpolation_d65 = get_model_interpolation('D65')
+    model_interpolation_d75 = get_model_interpolation('D75')
 
     bx = np.linspace(380, 750, 10000)
 
@@ -0,0 +1,157 @@
+import numpy as np
+import os
+import time
+import fcntl
+import contextlib
+import h5py
+
+
+labels_variables = ['variables_original', 'variables']
+labels_spectra = ['transmittance', 'reflectance', 'absorbance', 'fluxes_tran_empty', 'fluxes_refl', 'fluxes_tran']
+labels_scalars = ['time_elapsed', 'memory_peak', 'time_steps_empty', 'time_steps', 'error_reconstruction']
+labels_strings = ['backend', 'hash_voxelization']
+
+
+class ResultStore:
+    def __init__(self, path_store, size_chunk=256, dtype_spectra=np.float32, timeout=60.0):
+        assert isinstance(path_store, str)
+        assert isinstance(size_chunk, int)
+        assert isinstance(timeout, float)
+        assert size_chunk > 0
+        assert timeout > 0
+
+        self.path_store = path_store
+        self.path_lock = f'{path_store}.lock'
+        self.size_chunk = size_chunk
+        self.dtype_spectra = np.dtype(dtype_spectra)
+        self.timeout = timeout
+
+    @contextlib.contextmanager
+    def lock(self, is_exclusive):
+        # HDF5 has no concurrent writers, so that every access holds an advisory lock on a side file.
+        path_directory = os.path.dirname(os.path.abspath(self.path_store))
+        if not os.path.exists(path_directory):
+            os.makedirs(path_directory, exist_ok=True)
+
+        time_start = time.time()
+        operation = fcntl.LOCK_EX if is_exclusive else fcntl.LOCK_SH
+
+        with open(self.path_lock, 'a') as file_lock:
+            while True:
+                try:
+                    fcntl.flock(file_lock, operation | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.time() - time_start > self.timeout:
+                        raise TimeoutError(f'lock on {self.path_store} not acquired in {self.timeout} seconds')
+                    time.sleep(0.05)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(file_lock, fcntl.LOCK_UN)
+
+    def create(self, file_store, num_variables, wavelengths):
+        shape_chunk = (self.size_chunk, )
+
+        for label in labels_variables:
+            file_store.create_dataset(
+                label, shape=(0, num_variables), maxshape=(None, num_variables), dtype=np.float64,
+                chunks=shape_chunk + (num_variables, ))
+
+        for label in labels_spectra:
+            file_store.create_dataset(
+                label, shape=(0, wavelengths.shape[0]), maxshape=(None, wavelengths.shape[0]), dtype=self.dtype_spectra,
+                chunks=shape_chunk + (wavelengths.shape[0], ), compression='gzip', shuffle=True)
+
+        for label in labels_scalars:
+            file_store.create_dataset(
+                label, shape=(0, ), maxshape=(None, ), dtype=np.float64, chunks=shape_chunk, fillvalue=np.nan)
+
+        for label in labels_strings:
+            file_store.create_dataset(
+                label, shape=(0, ), maxshape=(None, ), dtype=h5py.string_dtype(), chunks=shape_chunk)
+
+        file_store.create_dataset('wavelengths', data=wavelengths)
+        file_store.attrs['num_rows'] = 0
+
+    def append(self, list_dict_all):
+        assert isinstance(list_dict_all, list)
+
+        if len(list_dict_all) == 0:
+            return
+
+        num_new = len(list_dict_all)
+        wavelengths = np.array(list_dict_all[0]['wavelengths'], dtype=np.float64)
+
+        with self.lock(True):
+            with h5py.File(self.path_store, 'a') as file_store:
+                if 'num_rows' not in file_store.attrs:
+                    self.create(file_store, len(list_dict_all[0]['variables']), wavelengths)
+
+                # every result of a structure, materials, and mesh shares a single wavelength grid.
+                assert np.allclose(file_store['wavelengths'][()], wavelengths)
+
+                num_rows = int(file_store.attrs['num_rows'])
+                num_capacity = file_store['variables'].shape[0]
+
+                # capacity is doubled in whole chunks, so that appends do not resize datasets every time.
+                if num_rows + num_new > num_capacity:
+                    num_capacity = max(2 * num_capacity, num_rows + num_new)
+                    num_capacity = int(np.ceil(num_capacity / self.size_chunk)) * self.size_chunk
+
+                    for label in labels_variables + labels_spectra + labels_scalars + labels_strings:
+                        file_store[label].resize(num_capacity, axis=0)
+
+                rows = slice(num_rows, num_rows + num_new)
+
+                for label in labels_variables + labels_spectra:
+                    file_store[label][rows] = np.array([dict_all[label] for dict_all in list_dict_all])
+
+                for label in labels_scalars:
+                    file_store[label][rows] = np.array([dict_all.get(label, np.nan) for dict_all in list_dict_all], dtype=np.float64)
+
+                for label in labels_strings:
+                    file_store[label][rows] = [str(dict_all.get(label, '')) for dict_all in list_dict_all]
+
+                # rows become visible to readers only after they are written.
+                file_store.attrs['num_rows'] = num_rows + num_new
+
+    def __len__(self):
+        if not os.path.exists(self.path_store):
+            return 0
+
+        with self.lock(False):
+            with h5py.File(self.path_store, 'r') as file_store:
+                return int(file_store.attrs.get('num_rows', 0))
+
+    def read(self, labels=None, rows=None):
+        # rows: None for all rows, a slice, or sorted row indices
+        if labels is None:
+            labels = labels_variables + labels_spectra + labels_scalars + labels_strings + ['wavelengths']
+
+        assert isinstance(labels, list)
+
+        dict_values = {}
+
+        with self.lock(False):
+            with h5py.File(self.path_store, 'r') as file_store:
+                num_rows = int(file_store.attrs['num_rows'])
+
+                if rows is None:
+                    rows = slice(0, num_rows)
+                elif isinstance(rows, slice):
+                    rows = slice(*rows.indices(num_rows))
+                else:
+                    rows = np.asarray(rows)
+                    assert np.all((rows >= 0) & (rows < num_rows))
+
+                for label in labels:
+                    if label == 'wavelengths':
+                        dict_values[label] = file_store[label][()]
+                    elif label in labels_strings:
+                        dict_values[label] = file_store[label].asstr()[rows]
+                    else:
+                        dict_values[label] = file_store[label][rows]
+
+        return dict_values
@@ -1,5 +1,4 @@
 import numpy as np
-import itertools
 
 from nanophotonic_structures.doublenanocones_2d import DoubleNanocones2D
 from nanophotonic_structures.doublenanocones_3d import DoubleNanocones3D
@@ -17,6 +16,7 @@ from nanophotonic_structures.threelayers_2d import ThreeLayers2D
 from nanophotonic_structures.threelayers_3d import ThreeLayers3D
 
 from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_grid
 
 
 def get_gap(str_structure):
@@ -38,21 +38,15 @@ def get_grids_unfiltered(str_structure, bounds):
         assert isinstance(bound[1], (int, np.int64))
 
     all_variables = [np.array(list(range(bound[0], bound[1] + 1, gap))) for bound in bounds]
-    grids = list(itertools.product(*all_variables))
+    grids = utils_grid.Grid(all_variables)
 
-    return np.array(grids), all_variables
+    return grids, all_variables
 
 def get_grids(str_structure, bounds):
+    # designs are decoded lazily from flat indices, since no structure filters its grid.
     grids, _ = get_grids_unfiltered(str_structure, bounds)
-    new_grids = []
 
-    for variables in grids:
-        if str_structure in []:
-            pass
-
-        new_grids.append(variables)
-
-    return np.array(new_grids)
+    return grids
 
 def get_bounds(str_structure):
     if str_structure in [
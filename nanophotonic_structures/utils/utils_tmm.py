@@ -0,0 +1,67 @@
+import numpy as np
+
+
+def get_refractive_indices(permittivities):
+    refractive_indices = np.sqrt(permittivities.astype(np.complex128))
+    refractive_indices = np.where(np.imag(refractive_indices) < 0, -refractive_indices, refractive_indices)
+
+    return refractive_indices
+
+def compute_transmittance_reflectance(
+    frequencies, permittivities, thicknesses,
+    permittivity_incidence=1.0, permittivity_exit=1.0
+):
+    # frequencies: (num_frequencies, ), in units of 1 / unit_length
+    # permittivities: (num_layers, num_frequencies), ordered along the propagation direction
+    # thicknesses: (num_designs, num_layers), in units of unit_length
+
+    assert isinstance(frequencies, np.ndarray)
+    assert isinstance(permittivities, np.ndarray)
+    assert isinstance(thicknesses, np.ndarray)
+    assert len(frequencies.shape) == 1
+    assert len(permittivities.shape) == 2
+    assert len(thicknesses.shape) == 2
+    assert permittivities.shape[0] == thicknesses.shape[1]
+    assert permittivities.shape[1] == frequencies.shape[0]
+
+    num_designs = thicknesses.shape[0]
+    num_frequencies = frequencies.shape[0]
+
+    index_incidence = get_refractive_indices(np.array(permittivity_incidence))
+    index_exit = get_refractive_indices(np.array(permittivity_exit))
+    indices = get_refractive_indices(permittivities)
+
+    m11 = np.ones((num_designs, num_frequencies), dtype=np.complex128)
+    m12 = np.zeros((num_designs, num_frequencies), dtype=np.complex128)
+    m21 = np.zeros((num_designs, num_frequencies), dtype=np.complex128)
+    m22 = np.ones((num_designs, num_frequencies), dtype=np.complex128)
+
+    for ind_layer in range(0, permittivities.shape[0]):
+        index = indices[ind_layer][np.newaxis, :]
+        phases = 2 * np.pi * frequencies[np.newaxis, :] * index * thicknesses[:, ind_layer][:, np.newaxis]
+
+        cos_phases = np.cos(phases)
+        sin_phases = np.sin(phases)
+
+        l11 = cos_phases
+        l12 = -1j * sin_phases / index
+        l21 = -1j * index * sin_phases
+        l22 = cos_phases
+
+        m11, m12, m21, m22 = (
+            m11 * l11 + m12 * l21,
+            m11 * l12 + m12 * l22,
+            m21 * l11 + m22 * l21,
+            m21 * l12 + m22 * l22,
+        )
+
+    numerator = m11 * index_incidence + m12 * index_incidence * index_exit - m21 - m22 * index_exit
+    denominator = m11 * index_incidence + m12 * index_incidence * index_exit + m21 + m22 * index_exit
+
+    coefficients_reflection = numerator / denominator
+    coefficients_transmission = 2 * index_incidence / denominator
+
+    reflectance = np.abs(coefficients_reflection)**2
+    transmittance = np.real(index_exit) / np.real(index_incidence) * np.abs(coefficients_transmission)**2
+
+    return transmittance, reflectance
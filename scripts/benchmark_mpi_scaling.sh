@@ -0,0 +1,17 @@
+#!/bin/bash
+
+IND_MATERIALS=$1
+FIDELITY=$2
+
+for STRUCTURE in nanospheres3d doublenanocones3d
+do
+    for NUM_PROCESSORS in 1 2 4 8 16
+    do
+        echo $STRUCTURE $IND_MATERIALS $FIDELITY $NUM_PROCESSORS
+
+        mpirun -np $NUM_PROCESSORS python ../src/benchmark_mpi_scaling.py --structure $STRUCTURE --ind_materials $IND_MATERIALS --fidelity $FIDELITY
+        sleep 0.1s
+    done
+
+    python ../src/report_mpi_scaling.py --structure $STRUCTURE --ind_materials $IND_MATERIALS --fidelity $FIDELITY
+done
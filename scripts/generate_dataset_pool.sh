@@ -0,0 +1,10 @@
+#!/bin/bash
+
+STRUCTURE=$1
+IND_MATERIALS=$2
+FIDELITY=$3
+NUM_WORKERS=${4:-$(nproc)}
+
+echo $STRUCTURE $IND_MATERIALS $FIDELITY $NUM_WORKERS
+
+python ../src/generate_dataset.py --structure $STRUCTURE --ind_materials $IND_MATERIALS --fidelity $FIDELITY --num_workers $NUM_WORKERS
@@ -0,0 +1,18 @@
+#!/bin/bash
+
+STRUCTURE=$1
+IND_MATERIALS=$2
+FIDELITY=$3
+NUM_WORKERS=${4:-1}
+
+python ../src/run_simulation_queue.py --structure $STRUCTURE --ind_materials $IND_MATERIALS --fidelity $FIDELITY --initialize
+
+for IND_WORKER in $(seq 1 1 $NUM_WORKERS)
+do
+    python ../src/run_simulation_queue.py --structure $STRUCTURE --ind_materials $IND_MATERIALS --fidelity $FIDELITY &
+    sleep 0.1s
+done
+
+wait
+
+python ../src/run_simulation_queue.py --structure $STRUCTURE --ind_materials $IND_MATERIALS --fidelity $FIDELITY --report
@@ -0,0 +1,12 @@
+#!/bin/bash
+
+IND_MATERIALS=$1
+FIDELITY=$2
+
+for STRUCTURE in nanospheres3d doublenanocones3d
+do
+    echo $STRUCTURE $IND_MATERIALS $FIDELITY
+
+    python ../src/verify_symmetries.py --structure $STRUCTURE --ind_materials $IND_MATERIALS --fidelity $FIDELITY || exit 1
+    sleep 0.1s
+done
@@ -16,6 +16,7 @@ setup(
     license='MIT',
     description='Datasets and Benchmarks for Nanophotonic Structure and Parametric Design Simulations',
     packages=list_packages,
+    package_data={'nanophotonic_structures': ['spectra/*.npy']},
     python_requires='>=3.7, <4',
     install_requires=required,
     classifiers=[
@@ -0,0 +1,77 @@
+import numpy as np
+import argparse
+import time
+
+from nanophotonic_structures.combinatorial_2d import Combinatorial2D
+from nanophotonic_structures.combinatorial_3d import Combinatorial3D
+
+
+def measure_setup(target_class, size_mesh, variables, use_material_grid):
+    obj = target_class(
+        depth_pml=50,
+        size_mesh=size_mesh,
+        mode='fixed',
+        use_material_grid=use_material_grid,
+    )
+
+    variables = obj.transform(variables)
+
+    time_start = time.time()
+    obj.change_size_cell(variables)
+    obj.define_experiment(variables)
+    obj.sim.init_sim()
+    time_end = time.time()
+
+    num_geometries = len(obj.geometries)
+    epsilons = np.array(obj.sim.get_epsilon())
+
+    obj.reset()
+
+    return time_end - time_start, num_geometries, epsilons
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--size_mesh', type=int, required=True)
+    parser.add_argument('--num_designs', type=int, default=5)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    size_mesh = args.size_mesh
+    num_designs = args.num_designs
+
+    seed = 42
+
+    assert str_structure in ['combinatorial2d', 'combinatorial3d']
+
+    if str_structure == 'combinatorial2d':
+        target_class = Combinatorial2D
+        num_variables = 80
+    elif str_structure == 'combinatorial3d':
+        target_class = Combinatorial3D
+        num_variables = 1600
+    else:
+        raise ValueError
+
+    random_state = np.random.RandomState(seed)
+
+    # designs from all air to no air, so that the number of non-air blocks varies.
+    ratios_air = np.linspace(1.0, 0.0, num_designs)
+
+    for ratio_air in ratios_air:
+        variables = random_state.choice(12, size=num_variables)
+        variables[random_state.uniform(size=num_variables) < ratio_air] = 1
+        num_blocks = int(np.sum(variables != 1))
+
+        time_blocks, num_geometries_blocks, epsilons_blocks = measure_setup(target_class, size_mesh, variables, False)
+        time_material_grids, num_geometries_material_grids, epsilons_material_grids = measure_setup(target_class, size_mesh, variables, True)
+
+        # material grids become the default only if they are faster and voxelize to the same epsilons.
+        error_epsilons = np.max(np.abs(epsilons_material_grids - epsilons_blocks))
+
+        print(f'{str_structure} size_mesh {size_mesh} num_blocks {num_blocks}', flush=True)
+        print(f'setup time with blocks {time_blocks:.4f} with {num_geometries_blocks} geometries', flush=True)
+        print(f'setup time with material grids {time_material_grids:.4f} with {num_geometries_material_grids} geometries', flush=True)
+        print(f'max difference of epsilons {error_epsilons:.4e}', flush=True)
+        print('', flush=True)
@@ -0,0 +1,84 @@
+import numpy as np
+import argparse
+import time
+import h5py
+
+from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_structures
+from nanophotonic_structures.utils import utils_solar
+from nanophotonic_structures.utils import utils_collect
+
+import constants as constants_src
+
+
+path_collected_datasets = constants_src.path_collected_datasets
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, default='nanowires2d')
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+    parser.add_argument('--property', type=str, default='absorbance')
+    parser.add_argument('--num_designs_loop', type=int, default=10000)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+    str_property = args.property
+    num_designs_loop = args.num_designs_loop
+
+    assert str_structure in ['nanocones2d', 'nanocones3d', 'nanowires2d', 'nanowires3d', 'nanospheres2d', 'nanospheres3d']
+    assert str_fidelity in ['low', 'medium', 'high']
+    assert str_property in ['transmittance', 'reflectance', 'absorbance']
+
+    _, _, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+    str_materials = '_'.join(materials)
+    size_mesh /= constants.unit_length
+
+    with h5py.File(utils_collect.get_path_dataset(path_collected_datasets, str_structure, str_materials, size_mesh, 'wavelengths'), 'r') as file_wavelengths:
+        wavelengths = file_wavelengths['data'][()]
+
+    with h5py.File(utils_collect.get_path_dataset(path_collected_datasets, str_structure, str_materials, size_mesh, str_property), 'r') as file_values:
+        values = file_values['data'][()]
+
+    values = np.reshape(values, (-1, values.shape[-1]), order='C')
+    values = values[~np.any(np.isnan(values), axis=1)]
+
+    if 'cSi' in materials:
+        str_mat = 'cSi'
+    elif 'GaAs' in materials:
+        str_mat = 'GaAs'
+    elif 'CH3NH3PbI3' in materials or 'methylammonium_lead_iodide' in materials:
+        str_mat = 'CH3NH3PbI3'
+    else:
+        str_mat = None
+
+    # the per-row definition is timed on a subset, and its time is extrapolated to the full dataset.
+    num_designs_loop = min(num_designs_loop, values.shape[0])
+
+    time_start = time.time()
+    efficiencies_loop = np.array([
+        utils_solar.compute_efficiency(wavelengths, elem, str_mat) for elem in values[:num_designs_loop]
+    ])
+    time_loop = (time.time() - time_start) * values.shape[0] / num_designs_loop
+
+    utils_solar.weights_cached.clear()
+
+    time_start = time.time()
+    efficiencies = utils_solar.compute_efficiencies(wavelengths, values, materials)
+    time_vectorized = time.time() - time_start
+
+    time_start = time.time()
+    utils_solar.compute_efficiencies(wavelengths, values, materials)
+    time_vectorized_cached = time.time() - time_start
+
+    print(f'num_designs {values.shape[0]} num_wavelengths {wavelengths.shape[0]}', flush=True)
+    print(f'max_abs_difference {np.max(np.abs(efficiencies[:num_designs_loop] - efficiencies_loop)):.4e}', flush=True)
+    print(f'time_loop {time_loop:.4f} (extrapolated from {num_designs_loop} designs)', flush=True)
+    print(f'time_vectorized {time_vectorized:.4f}', flush=True)
+    print(f'time_vectorized_cached {time_vectorized_cached:.4f}', flush=True)
+    print(f'speedup {time_loop / time_vectorized_cached:.1f}', flush=True)
@@ -0,0 +1,82 @@
+import numpy as np
+import argparse
+import os
+import meep as mp
+
+from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_structures
+
+import constants as constants_src
+
+
+path_mpi_scaling = constants_src.path_mpi_scaling
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+    parser.add_argument('--num_designs', type=int, default=3)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+    num_designs = args.num_designs
+
+    seed = 42
+
+    assert str_structure in [
+        'doublenanocones3d',
+        'nanocones3d',
+        'nanospheres3d',
+        'nanowires3d',
+        'threelayers3d',
+    ]
+    assert str_fidelity in ['low', 'medium', 'high']
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+    bounds = utils_structures.get_bounds(str_structure)
+    grids = utils_structures.get_grids(str_structure, bounds)
+
+    indices = np.random.RandomState(seed).choice(grids.shape[0], size=num_designs, replace=False)
+    grids = grids[indices]
+
+    num_processors = mp.count_processors()
+    times_elapsed = []
+
+    for variables in grids:
+        obj = target_class(
+            depth_pml=depth_pml,
+            size_mesh=size_mesh,
+            mode='decay',
+            materials=materials,
+        )
+
+        dict_all = obj.run(np.array(variables))
+        times_elapsed.append(dict_all['time_elapsed'])
+
+    if mp.am_master():
+        print(f'{str_structure} size_mesh {size_mesh} num_processors {num_processors}', flush=True)
+        print(f'mean time_elapsed {np.mean(times_elapsed):.4f}', flush=True)
+
+        dict_all = {
+            'str_structure': str_structure,
+            'ind_materials': ind_materials,
+            'str_fidelity': str_fidelity,
+            'num_processors': num_processors,
+            'variables': grids,
+            'times_elapsed': np.array(times_elapsed),
+        }
+
+        if not os.path.exists(path_mpi_scaling):
+            os.mkdir(path_mpi_scaling)
+
+        str_materials = '_'.join(materials)
+        size_mesh /= constants.unit_length
+
+        str_file = os.path.join(path_mpi_scaling, f'mpi_scaling_{str_structure}_{str_materials}_{size_mesh}_{num_processors}.npy')
+        np.save(str_file, dict_all)
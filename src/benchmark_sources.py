@@ -0,0 +1,79 @@
+import numpy as np
+import argparse
+import time
+
+from nanophotonic_structures.utils import utils_structures
+
+
+def measure_initialization(target_class, depth_pml, size_mesh, materials, variables, str_source):
+    obj = target_class(
+        depth_pml=depth_pml,
+        size_mesh=size_mesh,
+        mode='fixed',
+        materials=materials,
+        source=str_source,
+    )
+
+    variables = obj.transform(variables)
+
+    time_start = time.time()
+    obj.change_size_cell(variables)
+    obj.define_experiment(variables)
+    obj.sim_empty.init_sim()
+    obj.sim.init_sim()
+    time_end = time.time()
+
+    obj.reset()
+
+    return time_end - time_start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+    parser.add_argument('--num_designs', type=int, default=5)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+    num_designs = args.num_designs
+
+    seed = 42
+
+    assert str_structure in [
+        'doublenanocones3d',
+        'nanocones3d',
+        'nanospheres3d',
+        'nanowires3d',
+        'threelayers3d',
+    ]
+    assert str_fidelity in ['low', 'medium', 'high']
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+    bounds = utils_structures.get_bounds(str_structure)
+    grids = utils_structures.get_grids(str_structure, bounds)
+
+    indices = np.random.RandomState(seed).choice(grids.shape[0], size=num_designs, replace=False)
+    grids = grids[indices]
+
+    times_eigenmode = []
+    times_planewave = []
+
+    for variables in grids:
+        times_eigenmode.append(measure_initialization(
+            target_class, depth_pml, size_mesh, materials, np.array(variables), 'eigenmode'))
+        times_planewave.append(measure_initialization(
+            target_class, depth_pml, size_mesh, materials, np.array(variables), 'planewave'))
+
+        print(f'{str_structure} variables {variables}', flush=True)
+        print(f'initialization time with an eigenmode source {times_eigenmode[-1]:.4f}', flush=True)
+        print(f'initialization time with a plane-wave source {times_planewave[-1]:.4f}', flush=True)
+        print('', flush=True)
+
+    print(f'mean initialization time with an eigenmode source {np.mean(times_eigenmode):.4f}', flush=True)
+    print(f'mean initialization time with a plane-wave source {np.mean(times_planewave):.4f}', flush=True)
@@ -0,0 +1,90 @@
+import numpy as np
+import argparse
+import os
+
+from nanophotonic_structures.utils import utils_structures
+from nanophotonic_structures.utils import utils_cost
+
+import constants as constants_src
+
+
+path_cost_models = constants_src.path_cost_models
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+
+    assert str_fidelity in ['low', 'medium', 'high']
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+
+    obj = target_class(
+        depth_pml=depth_pml,
+        size_mesh=size_mesh,
+        materials=materials,
+    )
+    path_current = obj.get_path_current()
+
+    features = []
+    times_elapsed = []
+    features_memory = []
+    memories_peak = []
+
+    for str_file in sorted(os.listdir(path_current)):
+        if not str_file.endswith('.npy'):
+            continue
+
+        dict_properties = np.load(os.path.join(path_current, str_file), allow_pickle=True)[()]
+
+        # results reused from other designs or computed by other backends do not reflect FDTD runtimes.
+        if 'reused_from' in dict_properties or dict_properties.get('backend', 'fdtd') != 'fdtd':
+            continue
+
+        obj.num_frequencies_monitored = dict_properties.get('num_frequencies_monitored', None)
+
+        features.append(obj.get_features_cost(np.array(dict_properties['variables_original'])))
+        times_elapsed.append(dict_properties['time_elapsed'])
+
+        if 'memory_peak' in dict_properties:
+            features_memory.append(obj.get_features_memory(np.array(dict_properties['variables_original'])))
+            memories_peak.append(dict_properties['memory_peak'])
+
+    features = np.array(features)
+    times_elapsed = np.array(times_elapsed)
+    assert times_elapsed.shape[0] > 0
+
+    cost_model = utils_cost.CostModel().fit(features, times_elapsed)
+    errors = np.abs(np.log(cost_model.predict(features) / times_elapsed))
+
+    print(f'{obj.get_str_current_experiment()}', flush=True)
+    print(f'num_results {times_elapsed.shape[0]}', flush=True)
+    print(f'weights {cost_model.weights}', flush=True)
+    print(f'median relative error {np.expm1(np.median(errors)):.4f}', flush=True)
+
+    if not os.path.exists(path_cost_models):
+        os.mkdir(path_cost_models)
+
+    cost_model.save(os.path.join(path_cost_models, f'cost_model_{obj.get_str_current_experiment()}.npy'))
+
+    if len(memories_peak) > 0:
+        features_memory = np.array(features_memory)
+        memories_peak = np.array(memories_peak, dtype=float)
+
+        memory_model = utils_cost.MemoryModel().fit(features_memory, memories_peak)
+        errors = np.abs(memory_model.predict(features_memory) - memories_peak) / memories_peak
+
+        print(f'num_results_memory {memories_peak.shape[0]}', flush=True)
+        print(f'overhead {memory_model.overhead:.0f} scale {memory_model.scale:.4f}', flush=True)
+        print(f'median relative error of memory {np.median(errors):.4f}', flush=True)
+
+        memory_model.save(os.path.join(path_cost_models, f'memory_model_{obj.get_str_current_experiment()}.npy'))
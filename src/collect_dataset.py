@@ -0,0 +1,101 @@
+import numpy as np
+import argparse
+import os
+
+from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_structures
+from nanophotonic_structures.utils import utils_collect
+
+import constants as constants_src
+
+
+path_collected_datasets = constants_src.path_collected_datasets
+size_block = 4096
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+
+    assert str_fidelity in ['low', 'medium', 'high']
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+    bounds = utils_structures.get_bounds(str_structure)
+    _, all_variables = utils_structures.get_grids_unfiltered(str_structure, bounds)
+
+    obj = target_class(
+        depth_pml=depth_pml,
+        size_mesh=size_mesh,
+        materials=materials,
+    )
+    str_experiment = obj.get_str_current_experiment()
+    path_current = obj.get_path_current()
+
+    collector = utils_collect.Collector(
+        path_collected_datasets, str_structure, '_'.join(materials), size_mesh / constants.unit_length, all_variables)
+
+    if collector.is_initialized():
+        id_manifest, num_rows_store = collector.get_cursors()
+    else:
+        id_manifest, num_rows_store = 0, 0
+
+    num_collected = 0
+
+    # per-design results are found through the manifest, starting after the last collected id.
+    rows = obj.get_manifest().get_str_files_since(str_experiment, id_manifest, 'npy')
+
+    for ind_start in range(0, len(rows), size_block):
+        rows_block = rows[ind_start:ind_start + size_block]
+        list_dict_properties = []
+
+        for _, str_file in rows_block:
+            path_file = os.path.join(path_current, str_file)
+
+            if os.path.exists(path_file):
+                list_dict_properties.append(np.load(path_file, allow_pickle=True)[()])
+
+        if len(list_dict_properties) > 0:
+            num_collected += collector.scatter(
+                np.array([dict_properties['variables_original'] for dict_properties in list_dict_properties]),
+                np.array(list_dict_properties[0]['wavelengths']),
+                {
+                    label: np.array([dict_properties[label] for dict_properties in list_dict_properties])
+                    for label in utils_collect.labels_properties
+                },
+            )
+
+        id_manifest = rows_block[-1][0]
+
+        if collector.is_initialized():
+            collector.set_cursors(id_manifest, num_rows_store)
+
+    # rows appended to the result store are read in blocks, starting after the last collected row.
+    if os.path.exists(obj.get_path_store()):
+        store = obj.get_store()
+        num_rows = len(store)
+
+        for ind_start in range(num_rows_store, num_rows, size_block):
+            dict_values = store.read(
+                labels=['variables_original', 'wavelengths'] + utils_collect.labels_properties,
+                rows=slice(ind_start, min(ind_start + size_block, num_rows)),
+            )
+
+            num_collected += collector.scatter(dict_values['variables_original'], dict_values['wavelengths'], dict_values)
+            num_rows_store = min(ind_start + size_block, num_rows)
+
+            collector.set_cursors(id_manifest, num_rows_store)
+
+    print(f'{str_experiment}', flush=True)
+    print(f'num_collected {num_collected}', flush=True)
+
+    if collector.is_initialized():
+        print(f'num_points {collector.count()} of {len(collector.grid)}', flush=True)
@@ -0,0 +1,118 @@
+import numpy as np
+import argparse
+import os
+
+from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_structures
+
+import constants as constants_src
+
+
+path_backend_comparisons = constants_src.path_backend_comparisons
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+    parser.add_argument('--backend', type=str, required=True)
+    parser.add_argument('--order_fourier', type=int, default=constants.order_fourier_rcwa)
+    parser.add_argument('--num_slices', type=int, default=constants.num_slices_rcwa)
+    parser.add_argument('--num_designs', type=int, default=20)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+    str_backend = args.backend
+    order_fourier = args.order_fourier
+    num_slices = args.num_slices
+    num_designs = args.num_designs
+
+    seed = 42
+
+    assert str_structure in [
+        'threelayers2d',
+        'threelayers3d',
+        'nanowires2d',
+        'doublenanocones2d',
+    ]
+    assert str_fidelity in ['low', 'medium', 'high']
+    assert str_backend in ['tmm', 'rcwa']
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+    bounds = utils_structures.get_bounds(str_structure)
+    grids = utils_structures.get_grids(str_structure, bounds)
+
+    indices = np.random.RandomState(seed).choice(grids.shape[0], size=num_designs, replace=False)
+    grids = grids[indices]
+
+    str_materials = '_'.join(materials)
+    labels = ['transmittance', 'reflectance', 'absorbance']
+
+    errors = {label: [] for label in labels}
+    times_fdtd = []
+    times_backend = []
+
+    for variables in grids:
+        variables = np.array(variables)
+        print('variables')
+        print(variables)
+
+        obj_fdtd = target_class(
+            depth_pml=depth_pml,
+            size_mesh=size_mesh,
+            mode='decay',
+            materials=materials,
+        )
+        obj_backend = target_class(
+            depth_pml=depth_pml,
+            size_mesh=size_mesh,
+            mode='decay',
+            materials=materials,
+            backend=str_backend,
+            order_fourier=order_fourier,
+            num_slices=num_slices,
+        )
+
+        dict_fdtd = obj_fdtd.run(variables)
+        dict_backend = obj_backend.run(variables)
+
+        assert np.allclose(dict_fdtd['wavelengths'], dict_backend['wavelengths'])
+
+        for label in labels:
+            errors[label].append(np.mean(np.abs(dict_fdtd[label] - dict_backend[label])))
+        times_fdtd.append(dict_fdtd['time_elapsed'])
+        times_backend.append(dict_backend['time_elapsed'])
+
+    print('', flush=True)
+    print(f'{str_structure} {str_materials} {size_mesh} fdtd vs. {str_backend}', flush=True)
+    for label in labels:
+        print(f'mean absolute error of {label}: mean {np.mean(errors[label]):.4f} max {np.max(errors[label]):.4f}', flush=True)
+    print(f'time_elapsed fdtd: mean {np.mean(times_fdtd):.4f}', flush=True)
+    print(f'time_elapsed {str_backend}: mean {np.mean(times_backend):.4f}', flush=True)
+    print(f'speedup: {np.mean(times_fdtd) / np.mean(times_backend):.1f}x', flush=True)
+
+    dict_all = {
+        'str_structure': str_structure,
+        'ind_materials': ind_materials,
+        'str_fidelity': str_fidelity,
+        'str_backend': str_backend,
+        'str_materials': str_materials,
+        'order_fourier': order_fourier,
+        'num_slices': num_slices,
+        'seed': seed,
+        'variables': grids,
+        'errors': errors,
+        'times_fdtd': np.array(times_fdtd),
+        'times_backend': np.array(times_backend),
+    }
+
+    if not os.path.exists(path_backend_comparisons):
+        os.mkdir(path_backend_comparisons)
+
+    str_file = os.path.join(path_backend_comparisons, f'comparison_{str_structure}_{str_materials}_{size_mesh}_{str_backend}_{order_fourier}_{num_slices}.npy')
+    np.save(str_file, dict_all)
@@ -1,3 +1,8 @@
 path_collected_datasets = '../collected_datasets'
 path_trained_models = '../trained_models'
 path_optimization_results = '../optimization_results'
+path_backend_comparisons = '../backend_comparisons'
+path_mpi_scaling = '../mpi_scaling'
+path_queues = '../queues'
+path_cost_models = '../cost_models'
+path_targets = '../targets'
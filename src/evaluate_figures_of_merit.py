@@ -0,0 +1,79 @@
+import numpy as np
+import argparse
+import os
+import h5py
+
+from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_structures
+from nanophotonic_structures.utils import utils_efficiency
+from nanophotonic_structures.utils import utils_collect
+
+import constants as constants_src
+
+
+path_collected_datasets = constants_src.path_collected_datasets
+
+cutoff_wavelengths = [1107, 867, 821] # cSi, GaAs, and CH3NH3PbI3
+standard_illuminants = ['C', 'D50', 'D55', 'D65', 'D75']
+
+
+def get_metrics(wavelengths):
+    list_metrics = []
+
+    # solar metrics are computed only for wavelength grids beyond the visible range.
+    if np.max(wavelengths) > constants.wavelength_visible[1]:
+        list_metrics.append(utils_efficiency.get_metric('AM1.5G'))
+
+        for cutoff_wavelength in cutoff_wavelengths:
+            list_metrics.append(utils_efficiency.get_metric('AM1.5G', cutoff_wavelength=cutoff_wavelength))
+            list_metrics.append(utils_efficiency.get_metric('AM1.5G', cutoff_wavelength=cutoff_wavelength, use_photon_flux=True))
+
+    for str_standard_illuminant in standard_illuminants:
+        list_metrics.append(utils_efficiency.get_metric(str_standard_illuminant, band=constants.wavelength_visible))
+
+    return list_metrics
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+    parser.add_argument('--property', type=str, default='absorbance')
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+    str_property = args.property
+
+    assert str_fidelity in ['low', 'medium', 'high']
+    assert str_property in ['transmittance', 'reflectance', 'absorbance']
+
+    _, _, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+    str_materials = '_'.join(materials)
+    size_mesh /= constants.unit_length
+
+    with h5py.File(utils_collect.get_path_dataset(path_collected_datasets, str_structure, str_materials, size_mesh, 'wavelengths'), 'r') as file_wavelengths:
+        wavelengths = file_wavelengths['data'][()]
+
+    list_metrics = get_metrics(wavelengths)
+    names_metrics = [utils_efficiency.get_name_metric(dict_metric) for dict_metric in list_metrics]
+    weights = utils_efficiency.get_weights_metrics(wavelengths, list_metrics)
+
+    # spectra are streamed from the chunked dataset, and every metric is computed in a single pass.
+    with h5py.File(utils_collect.get_path_dataset(path_collected_datasets, str_structure, str_materials, size_mesh, str_property), 'r') as file_values:
+        metrics = utils_efficiency.evaluate_metrics(file_values['data'], weights)
+
+    path_metrics = utils_collect.get_path_dataset(path_collected_datasets, str_structure, str_materials, size_mesh, f'{str_property}_metrics')
+
+    with h5py.File(path_metrics, 'w') as file_metrics:
+        file_metrics.create_dataset('data', data=metrics)
+        file_metrics.attrs['names'] = names_metrics
+
+    print(f'saved at {path_metrics}', flush=True)
+
+    for ind_metric, str_name in enumerate(names_metrics):
+        print(f'{str_name} mean {np.nanmean(metrics[..., ind_metric]):.4f} max {np.nanmax(metrics[..., ind_metric]):.4f}', flush=True)
@@ -0,0 +1,191 @@
+import numpy as np
+import argparse
+import os
+import time
+import multiprocessing
+import multiprocessing.util
+import concurrent.futures
+
+from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_structures
+from nanophotonic_structures.utils import utils_cost
+
+import constants as constants_src
+
+
+path_cost_models = constants_src.path_cost_models
+size_block = 4096
+
+
+obj = None
+
+
+def initialize_worker(str_structure, ind_materials, str_fidelity, kwargs):
+    global obj
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+
+    # each worker reuses a single structure instance, so that caches in memory persist across designs.
+    obj = target_class(
+        depth_pml=depth_pml,
+        size_mesh=size_mesh,
+        mode='decay',
+        materials=materials,
+        save_properties=True,
+        **kwargs,
+    )
+
+    # buffered results are appended to a store when a worker exits, after the last design it runs.
+    multiprocessing.util.Finalize(None, obj.flush_store, exitpriority=10)
+
+def run_design(variables):
+    time_start = time.time()
+
+    try:
+        dict_all = obj.run(np.array(variables))
+        # a reused voxelization carries no memory_peak, since no simulation was run.
+        memory_peak = dict_all.get('memory_peak', utils_cost.get_memory_peak())
+        str_error = None
+    except Exception as e:
+        memory_peak = utils_cost.get_memory_peak()
+        str_error = repr(e)
+
+    return variables, str_error, time.time() - time_start, memory_peak
+
+def report_design(future, memory_predicted):
+    variables, str_error, _, memory_peak = future.result()
+
+    if str_error is not None:
+        print(f'failed {variables} {str_error}', flush=True)
+
+    print(f'memory of {variables} predicted {memory_predicted / 1024**3:.3f} GB peak {memory_peak / 1024**3:.3f} GB', flush=True)
+
+    return str_error is None
+
+def collect_designs(futures, return_when):
+    # futures maps futures to predicted memory, and completed futures are removed.
+    done, _ = concurrent.futures.wait(list(futures.keys()), return_when=return_when)
+
+    num_completed = 0
+    num_failed = 0
+
+    for future in done:
+        if report_design(future, futures.pop(future)):
+            num_completed += 1
+        else:
+            num_failed += 1
+
+    return num_completed, num_failed
+
+def get_memory_total():
+    return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+    parser.add_argument('--num_workers', type=int, default=os.cpu_count())
+    parser.add_argument('--use_cache_empty', action='store_true')
+    parser.add_argument('--path_cache_empty', type=str, default=None)
+    parser.add_argument('--use_symmetries', action='store_true')
+    parser.add_argument('--num_frequencies_monitored', type=int, default=None)
+    parser.add_argument('--stop_policy', type=str, default='fields')
+    parser.add_argument('--source', type=str, default='eigenmode')
+    parser.add_argument('--memory_budget', type=float, default=None)
+    parser.add_argument('--format_properties', type=str, default='npy')
+    parser.add_argument('--size_buffer_store', type=int, default=constants.size_buffer_store)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+    num_workers = args.num_workers
+    # a memory budget in GB, which is 90% of physical memory by default
+    memory_budget = args.memory_budget * 1024**3 if args.memory_budget is not None else 0.9 * get_memory_total()
+
+    kwargs = {
+        'use_cache_empty': args.use_cache_empty,
+        'path_cache_empty': args.path_cache_empty,
+        'use_symmetries': args.use_symmetries,
+        'num_frequencies_monitored': args.num_frequencies_monitored,
+        'stop_policy': args.stop_policy,
+        'source': args.source,
+        'format_properties': args.format_properties,
+        'size_buffer_store': args.size_buffer_store,
+    }
+
+    assert str_fidelity in ['low', 'medium', 'high']
+    assert num_workers > 0
+    assert memory_budget > 0
+    assert kwargs['stop_policy'] in ['fields', 'fluxes']
+    assert kwargs['source'] in ['eigenmode', 'planewave']
+    assert kwargs['format_properties'] in ['npy', 'hdf5']
+    assert kwargs['size_buffer_store'] > 0
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+    bounds = utils_structures.get_bounds(str_structure)
+    grids = utils_structures.get_grids(str_structure, bounds)
+
+    obj_paths = target_class(
+        depth_pml=depth_pml,
+        size_mesh=size_mesh,
+        materials=materials,
+        num_frequencies_monitored=kwargs['num_frequencies_monitored'],
+    )
+
+    path_memory_model = os.path.join(path_cost_models, f'memory_model_{obj_paths.get_str_current_experiment()}.npy')
+
+    if os.path.exists(path_memory_model):
+        memory_model = utils_cost.MemoryModel.load(path_memory_model)
+    else:
+        memory_model = utils_cost.MemoryModel()
+
+    num_completed = 0
+    num_failed = 0
+    num_skipped = 0
+    time_start = time.time()
+
+    # meep is not fork-safe after initialization, so that workers are spawned.
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=num_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=initialize_worker,
+        initargs=(str_structure, ind_materials, str_fidelity, kwargs),
+    ) as executor:
+        futures = {}
+
+        # design points are streamed, and they are admitted while predicted memory fits the budget.
+        for ind_start in range(0, len(grids), size_block):
+            # infeasible designs are removed in bulk before they are submitted.
+            block = grids[ind_start:ind_start + size_block]
+            block = block[obj_paths.is_feasible(block)]
+
+            # completed designs are skipped with a single manifest query per block.
+            is_completed = obj_paths.is_completed(block)
+            num_skipped += int(np.sum(is_completed))
+
+            for variables in block[~is_completed]:
+                memory_predicted = memory_model.predict(obj_paths.get_features_memory(np.array(variables))[np.newaxis, ...])[0]
+
+                if memory_predicted > memory_budget:
+                    print(f'predicted memory of {variables} exceeds the budget, so that it runs alone', flush=True)
+
+                while len(futures) >= num_workers or (len(futures) > 0 and sum(futures.values()) + memory_predicted > memory_budget):
+                    num_completed_, num_failed_ = collect_designs(futures, concurrent.futures.FIRST_COMPLETED)
+                    num_completed += num_completed_
+                    num_failed += num_failed_
+
+                    print(f'completed {num_completed} failed {num_failed} skipped {num_skipped} time {time.time() - time_start:.1f}', flush=True)
+
+                futures[executor.submit(run_design, variables)] = memory_predicted
+
+        num_completed_, num_failed_ = collect_designs(futures, concurrent.futures.ALL_COMPLETED)
+        num_completed += num_completed_
+        num_failed += num_failed_
+
+    print(f'completed {num_completed} failed {num_failed} skipped {num_skipped} time {time.time() - time_start:.1f}', flush=True)
@@ -54,6 +54,7 @@ if __name__ == '__main__':
     parser.add_argument('--property', type=str, required=True)
     parser.add_argument('--algorithm', type=str, required=True)
     parser.add_argument('--ind_round', type=int, required=True)
+    parser.add_argument('--run_concurrently', action='store_true')
 
     args = parser.parse_args()
 
@@ -63,6 +64,7 @@ if __name__ == '__main__':
     str_property = args.property
     str_algorithm = args.algorithm
     ind_round = args.ind_round
+    run_concurrently = args.run_concurrently
 
     num_rounds = 50
     num_iter = 1000
@@ -92,7 +94,8 @@ if __name__ == '__main__':
     str_materials = '_'.join(materials)
 
     def fun_target(bx):
-        return utils_optimization.evaluate_direct(bx, str_structure, ind_materials, str_fidelity, str_property)
+        return utils_optimization.evaluate_direct(
+            bx, str_structure, ind_materials, str_fidelity, str_property, run_concurrently=run_concurrently)
 
     X_initial = np.random.RandomState(seed).uniform(size=(num_rounds, bounds.shape[0]))
     X_initial = (bounds[:, 1] - bounds[:, 0]) * X_initial + bounds[:, 0]
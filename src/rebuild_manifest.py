@@ -0,0 +1,39 @@
+import argparse
+
+from nanophotonic_structures.utils import utils_structures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+
+    assert str_fidelity in ['low', 'medium', 'high']
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+
+    obj = target_class(
+        depth_pml=depth_pml,
+        size_mesh=size_mesh,
+        materials=materials,
+    )
+
+    # results saved before the manifest existed are indexed once, so that resume checks find them.
+    num_results = obj.get_manifest().rebuild(
+        obj.get_str_current_experiment(),
+        obj.name,
+        obj.list_materials,
+        obj.size_mesh,
+        obj.get_path_current(),
+    )
+
+    print(f'{obj.get_str_current_experiment()}', flush=True)
+    print(f'num_indexed_results {num_results}', flush=True)
@@ -0,0 +1,56 @@
+import argparse
+import os
+import numpy as np
+
+from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_structures
+
+import constants as constants_src
+
+
+path_mpi_scaling = constants_src.path_mpi_scaling
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+
+    assert str_fidelity in ['low', 'medium', 'high']
+
+    _, _, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+
+    str_materials = '_'.join(materials)
+    size_mesh /= constants.unit_length
+
+    prefix = f'mpi_scaling_{str_structure}_{str_materials}_{size_mesh}_'
+    dict_times = {}
+
+    if os.path.exists(path_mpi_scaling):
+        for str_file in os.listdir(path_mpi_scaling):
+            if not (str_file.startswith(prefix) and str_file.endswith('.npy')):
+                continue
+
+            dict_all = np.load(os.path.join(path_mpi_scaling, str_file), allow_pickle=True)[()]
+            dict_times[dict_all['num_processors']] = np.mean(dict_all['times_elapsed'])
+
+    print(f'{str_structure} {str_materials} {size_mesh}', flush=True)
+
+    # speedups and efficiencies are relative to the smallest number of processors measured.
+    if len(dict_times) > 0:
+        num_processors_base = min(dict_times.keys())
+        time_base = dict_times[num_processors_base] * num_processors_base
+
+        for num_processors in sorted(dict_times.keys()):
+            speedup = time_base / dict_times[num_processors]
+            efficiency = speedup / num_processors
+
+            print(f'num_processors {num_processors} time_elapsed {dict_times[num_processors]:.4f} speedup {speedup:.2f} efficiency {efficiency:.2f}', flush=True)
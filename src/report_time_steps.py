@@ -0,0 +1,64 @@
+import argparse
+import os
+import numpy as np
+
+from nanophotonic_structures.utils import utils_structures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+
+    assert str_fidelity in ['low', 'medium', 'high']
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+
+    obj = target_class(
+        depth_pml=depth_pml,
+        size_mesh=size_mesh,
+        materials=materials,
+    )
+    path_current = obj.get_path_current()
+
+    dict_time_steps = {}
+
+    if os.path.exists(path_current):
+        for str_file in os.listdir(path_current):
+            if not str_file.endswith('.npy'):
+                continue
+
+            dict_properties = np.load(os.path.join(path_current, str_file), allow_pickle=True)[()]
+
+            if 'time_steps' not in dict_properties or 'reused_from' in dict_properties:
+                continue
+
+            str_stop_policy = dict_properties['stop_policy']
+
+            if str_stop_policy not in dict_time_steps:
+                dict_time_steps[str_stop_policy] = []
+
+            dict_time_steps[str_stop_policy].append([
+                dict_properties['time_steps'],
+                dict_properties['time_steps_empty'],
+                dict_properties['time_elapsed'],
+            ])
+
+    print(f'{obj.get_str_current_experiment()}', flush=True)
+
+    for str_stop_policy, time_steps in sorted(dict_time_steps.items()):
+        time_steps = np.array(time_steps)
+
+        print(f'stop_policy {str_stop_policy}', flush=True)
+        print(f'num_results {time_steps.shape[0]}', flush=True)
+        print(f'time_steps mean {np.mean(time_steps[:, 0]):.1f} median {np.median(time_steps[:, 0]):.1f} max {np.max(time_steps[:, 0]):.1f}', flush=True)
+        print(f'time_steps_empty mean {np.mean(time_steps[:, 1]):.1f}', flush=True)
+        print(f'time_elapsed mean {np.mean(time_steps[:, 2]):.4f}', flush=True)
@@ -0,0 +1,55 @@
+import argparse
+import os
+
+from nanophotonic_structures.utils import utils_structures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+
+    assert str_fidelity in ['low', 'medium', 'high']
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+
+    obj = target_class(
+        depth_pml=depth_pml,
+        size_mesh=size_mesh,
+        materials=materials,
+    )
+    path_voxelizations = obj.get_path_voxelizations()
+
+    num_voxelizations = 0
+    num_results = 0
+
+    if os.path.exists(path_voxelizations):
+        for str_file in os.listdir(path_voxelizations):
+            if not str_file.endswith('.txt'):
+                continue
+
+            with open(os.path.join(path_voxelizations, str_file), 'r') as file_index:
+                lines = [line for line in file_index.read().splitlines() if line != '']
+
+            if len(lines) == 0:
+                continue
+
+            num_voxelizations += 1
+            num_results += len(set(lines))
+
+    num_saved = num_results - num_voxelizations
+
+    print(f'{obj.get_str_current_experiment()}', flush=True)
+    print(f'num_results {num_results}', flush=True)
+    print(f'num_voxelizations {num_voxelizations}', flush=True)
+    print(f'num_saved_simulations {num_saved}', flush=True)
+    if num_results > 0:
+        print(f'ratio_saved_simulations {num_saved / num_results:.4f}', flush=True)
@@ -1,11 +1,18 @@
 import numpy as np
 import argparse
 import os
+import traceback
+import meep as mp
 
+from nanophotonic_structures import constants
 from nanophotonic_structures.utils import utils_structures
+from nanophotonic_structures.utils import utils_cost
+
+import constants as constants_src
 
 
 skip_experiment = True
+path_cost_models = constants_src.path_cost_models
 
 
 if __name__ == '__main__':
@@ -15,6 +22,18 @@ if __name__ == '__main__':
     parser.add_argument('--fidelity', type=str, required=True)
     parser.add_argument('--num_chunks', type=int, required=True)
     parser.add_argument('--ind_chunk', type=int, required=True)
+    parser.add_argument('--use_cache_empty', action='store_true')
+    parser.add_argument('--path_cache_empty', type=str, default=None)
+    parser.add_argument('--backend', type=str, default='fdtd')
+    parser.add_argument('--use_symmetries', action='store_true')
+    parser.add_argument('--use_cache_voxelization', action='store_true')
+    parser.add_argument('--num_frequencies_monitored', type=int, default=None)
+    parser.add_argument('--stop_policy', type=str, default='fields')
+    parser.add_argument('--source', type=str, default='eigenmode')
+    parser.add_argument('--num_groups', type=int, default=None)
+    parser.add_argument('--balance_chunks', action='store_true')
+    parser.add_argument('--format_properties', type=str, default='npy')
+    parser.add_argument('--size_buffer_store', type=int, default=constants.size_buffer_store)
 
     args = parser.parse_args()
 
@@ -23,6 +42,18 @@ if __name__ == '__main__':
     str_fidelity = args.fidelity
     num_chunks = args.num_chunks
     ind_chunk = args.ind_chunk
+    use_cache_empty = args.use_cache_empty
+    path_cache_empty = args.path_cache_empty
+    str_backend = args.backend
+    use_symmetries = args.use_symmetries
+    use_cache_voxelization = args.use_cache_voxelization
+    num_frequencies_monitored = args.num_frequencies_monitored
+    str_stop_policy = args.stop_policy
+    str_source = args.source
+    num_groups = args.num_groups
+    balance_chunks = args.balance_chunks
+    str_format_properties = args.format_properties
+    size_buffer_store = args.size_buffer_store
 
     assert str_structure in [
         'doublenanocones2d',
@@ -37,6 +68,11 @@ if __name__ == '__main__':
         'nanowires3d',
     ]
     assert str_fidelity in ['low', 'medium', 'high']
+    assert str_backend in ['fdtd', 'tmm', 'rcwa']
+    assert str_stop_policy in ['fields', 'fluxes']
+    assert str_source in ['eigenmode', 'planewave']
+    assert str_format_properties in ['npy', 'hdf5']
+    assert size_buffer_store > 0
     assert ind_chunk < num_chunks
 
     target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
@@ -44,34 +80,108 @@ if __name__ == '__main__':
     bounds = utils_structures.get_bounds(str_structure)
     grids = utils_structures.get_grids(str_structure, bounds)
 
-    size_chunk = grids.shape[0] // num_chunks
-    if grids.shape[0] % num_chunks != 0:
-        size_chunk += 1
-
-    grids = grids[ind_chunk * size_chunk:(ind_chunk + 1) * size_chunk]
+    if balance_chunks:
+        # chunks have equal predicted wall time, with a calibrated cost model if it exists.
+        obj = target_class(
+            depth_pml=depth_pml,
+            size_mesh=size_mesh,
+            materials=materials,
+            num_frequencies_monitored=num_frequencies_monitored,
+        )
+        path_cost_model = os.path.join(path_cost_models, f'cost_model_{obj.get_str_current_experiment()}.npy')
+
+        if os.path.exists(path_cost_model):
+            cost_model = utils_cost.CostModel.load(path_cost_model)
+        else:
+            cost_model = utils_cost.CostModel()
+
+        # features are computed for a block of designs at once, so that the grid is never materialized.
+        features = np.concatenate([
+            obj.get_features_cost(grids[ind_start:ind_start + grids.size_block])
+            for ind_start in range(0, grids.shape[0], grids.size_block)
+        ], axis=0)
+        chunks = utils_cost.partition(cost_model.predict(features), num_chunks)
+
+        grids = grids[chunks[ind_chunk]]
+    else:
+        size_chunk = grids.shape[0] // num_chunks
+        if grids.shape[0] % num_chunks != 0:
+            size_chunk += 1
+
+        grids = grids[ind_chunk * size_chunk:(ind_chunk + 1) * size_chunk]
+
+    # 2D jobs run one design per rank, and 3D jobs spread a single design over all ranks by default.
+    if num_groups is None:
+        num_groups = mp.count_processors() if str_structure.endswith('2d') else 1
+
+    assert num_groups > 0
+    assert mp.count_processors() % num_groups == 0
+
+    if num_groups > 1:
+        ind_group = mp.divide_parallel_processes(num_groups)
+        grids = grids[ind_group::num_groups]
+
+    # infeasible designs are removed in bulk before any meep object is created.
+    obj_feasibility = target_class(
+        depth_pml=depth_pml,
+        size_mesh=size_mesh,
+        materials=materials,
+    )
+    grids = grids[obj_feasibility.is_feasible(grids)]
+
+    if skip_experiment:
+        # completed designs are found with a single manifest query, instead of a stat per design.
+        is_completed = obj_feasibility.is_completed(grids)
+
+        if mp.am_master():
+            print(f'passed {np.sum(is_completed)} completed designs')
+
+        grids = grids[~is_completed]
+
+    if str_backend != 'fdtd':
+        obj = target_class(
+            depth_pml=depth_pml,
+            size_mesh=size_mesh,
+            mode='decay',
+            materials=materials,
+            save_properties=True,
+            backend=str_backend,
+            format_properties=str_format_properties,
+        )
+
+        if len(grids) > 0:
+            obj.run_batch(np.array(grids))
+    else:
+        # a single structure instance is reused, so that results are buffered across designs and appended to a store in batches.
+        obj = target_class(
+            depth_pml=depth_pml,
+            size_mesh=size_mesh,
+            mode='decay',
+            materials=materials,
+            save_properties=True,
+            use_cache_empty=use_cache_empty,
+            path_cache_empty=path_cache_empty,
+            use_symmetries=use_symmetries,
+            use_cache_voxelization=use_cache_voxelization,
+            num_frequencies_monitored=num_frequencies_monitored,
+            stop_policy=str_stop_policy,
+            source=str_source,
+            format_properties=str_format_properties,
+            size_buffer_store=size_buffer_store,
+        )
 
-    for variables in grids:
         try:
-            obj = target_class(
-                depth_pml=depth_pml,
-                size_mesh=size_mesh,
-                mode='decay',
-                materials=materials,
-                save_properties=True,
-            )
-
-            variables = np.array(variables)
-            print('variables')
-            print(variables)
-
-            if skip_experiment:
-                path_current = obj.get_path_current()
-                str_file = obj.get_str_file(obj.transform(variables))
-
-                if os.path.exists(os.path.join(path_current, str_file)):
-                    print('passed')
-                    continue
-
-            obj.run(variables)
-        except:
-            pass
+            for variables in grids:
+                try:
+                    variables = np.array(variables)
+                    if mp.am_master():
+                        print('variables')
+                        print(variables)
+
+                    obj.run(variables)
+                except Exception:
+                    # a failed design does not stop a chunk, and its traceback is printed to find it afterward.
+                    print(f'failed variables {variables} on rank {mp.my_rank()}', flush=True)
+                    traceback.print_exc()
+        finally:
+            obj.flush_store()
@@ -0,0 +1,147 @@
+import numpy as np
+import argparse
+import os
+import socket
+import traceback
+import contextlib
+
+from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_structures
+from nanophotonic_structures.utils import utils_queue
+
+import constants as constants_src
+
+
+path_queues = constants_src.path_queues
+size_block = 4096
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, required=True)
+    parser.add_argument('--ind_materials', type=int, required=True)
+    parser.add_argument('--fidelity', type=str, required=True)
+    parser.add_argument('--initialize', action='store_true')
+    parser.add_argument('--report', action='store_true')
+    parser.add_argument('--reset_failed', action='store_true')
+    parser.add_argument('--worker', type=str, default=f'{socket.gethostname()}_{os.getpid()}')
+    parser.add_argument('--duration_lease', type=float, default=600.0)
+    parser.add_argument('--max_attempts', type=int, default=3)
+    parser.add_argument('--use_cache_empty', action='store_true')
+    parser.add_argument('--path_cache_empty', type=str, default=None)
+    parser.add_argument('--use_symmetries', action='store_true')
+    parser.add_argument('--stop_policy', type=str, default='fields')
+    parser.add_argument('--source', type=str, default='eigenmode')
+    parser.add_argument('--format_properties', type=str, default='npy')
+    parser.add_argument('--size_buffer_store', type=int, default=constants.size_buffer_store)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+    str_worker = args.worker
+
+    assert str_fidelity in ['low', 'medium', 'high']
+    assert args.stop_policy in ['fields', 'fluxes']
+    assert args.source in ['eigenmode', 'planewave']
+    assert args.format_properties in ['npy', 'hdf5']
+    assert args.size_buffer_store > 0
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+
+    str_materials = '_'.join(materials)
+    str_queue = f'queue_{str_structure}_{str_materials}_{size_mesh / constants.unit_length}.sqlite'
+
+    queue = utils_queue.JobQueue(
+        os.path.join(path_queues, str_queue),
+        duration_lease=args.duration_lease,
+        max_attempts=args.max_attempts,
+    )
+
+    if args.initialize:
+        bounds = utils_structures.get_bounds(str_structure)
+        grids = utils_structures.get_grids(str_structure, bounds)
+
+        obj = target_class(
+            depth_pml=depth_pml,
+            size_mesh=size_mesh,
+            materials=materials,
+        )
+
+        for ind_start in range(0, len(grids), size_block):
+            block = grids[ind_start:ind_start + size_block]
+            block = block[obj.is_feasible(block)]
+            queue.add(block[~obj.is_completed(block)])
+
+    if args.reset_failed:
+        queue.reset_failed()
+
+    if args.report:
+        print(queue.count(), flush=True)
+
+        for variables, worker, time_failure, error in queue.get_failures():
+            print(f'failed {variables} on {worker} at {time_failure:.1f}: {error}', flush=True)
+
+    if args.initialize or args.report or args.reset_failed:
+        exit()
+
+    obj = target_class(
+        depth_pml=depth_pml,
+        size_mesh=size_mesh,
+        mode='decay',
+        materials=materials,
+        save_properties=True,
+        use_cache_empty=args.use_cache_empty,
+        path_cache_empty=args.path_cache_empty,
+        use_symmetries=args.use_symmetries,
+        stop_policy=args.stop_policy,
+        source=args.source,
+        format_properties=args.format_properties,
+        size_buffer_store=args.size_buffer_store,
+    )
+
+    # jobs whose results are still buffered are completed only after the buffer is appended to a store,
+    # and their leases are kept alive meanwhile, so that a dead worker loses no completed job.
+    ids_buffered = []
+
+    while True:
+        job = queue.acquire(str_worker)
+
+        if job is None:
+            break
+
+        id_job, variables = job
+        variables = np.array(variables)
+
+        print(f'{str_worker} acquired {variables}', flush=True)
+
+        if obj.is_completed(variables[np.newaxis, ...])[0]:
+            print('passed', flush=True)
+            queue.complete(id_job, str_worker)
+            continue
+
+        try:
+            with contextlib.ExitStack() as stack:
+                for id_job_ in [id_job] + ids_buffered:
+                    stack.enter_context(utils_queue.Heartbeat(queue, id_job_, str_worker))
+
+                obj.run(variables)
+        except Exception:
+            queue.fail(id_job, str_worker, traceback.format_exc())
+        else:
+            ids_buffered.append(id_job)
+
+        if len(obj.buffer_store) == 0:
+            for id_job_ in ids_buffered:
+                queue.complete(id_job_, str_worker)
+
+            ids_buffered = []
+
+    obj.flush_store()
+
+    for id_job_ in ids_buffered:
+        queue.complete(id_job_, str_worker)
+
+    print(queue.count(), flush=True)
@@ -8,6 +8,7 @@ import constants as constants_src
 
 path_collected_datasets = constants_src.path_collected_datasets
 path_trained_models = constants_src.path_trained_models
+path_targets = constants_src.path_targets
 
 
 if __name__ == '__main__':
@@ -19,6 +20,7 @@ if __name__ == '__main__':
     parser.add_argument('--ind_materials', type=int, required=True)
     parser.add_argument('--fidelity', type=str, required=True)
     parser.add_argument('--property', type=str, required=True)
+    parser.add_argument('--max_megabytes_block', type=int, default=256)
 
     args = parser.parse_args()
 
@@ -26,6 +28,8 @@ if __name__ == '__main__':
     ind_materials = args.ind_materials
     str_fidelity = args.fidelity
     str_property = args.property
+    # spectra are converted in blocks of at most this size, so that peak memory does not grow with datasets.
+    max_bytes_block = args.max_megabytes_block * 1024**2
 
     assert str_structure in [
         'threelayers2d',
@@ -41,25 +45,14 @@ if __name__ == '__main__':
     ]
     assert str_fidelity in ['low', 'medium', 'high']
     assert str_property in ['transmittance', 'reflectance', 'absorbance']
+    assert max_bytes_block > 0
 
-    variables, wavelengths, values, str_materials, size_mesh, materials = train_test.load_dataset(
-        path_collected_datasets, str_structure, ind_materials, str_fidelity, str_property)
+    # targets are derived once per dataset content, and they are memory-mapped on later runs.
+    X, by, str_materials, size_mesh = train_test.load_targets(
+        path_collected_datasets, path_targets, str_structure, ind_materials, str_fidelity, str_property,
+        max_bytes_block=max_bytes_block)
 
-    print(variables.shape, flush=True)
-    print(wavelengths.shape, flush=True)
-    print(values.shape, flush=True)
-
-    if str_structure in [
-        'threelayers2d',
-        'threelayers3d',
-        'nanocones2d',
-        'nanocones3d',
-        'doublenanocones2d',
-        'doublenanocones3d',
-    ]:
-        materials = []
-
-    X, by = train_test.convert_dataset(variables, wavelengths, values, materials, str_structure)
+    print(X.shape, by.shape, flush=True)
     X_train, X_valid, X_test, by_train, by_valid, by_test = train_test.split_dataset(X, by)
 
     print(X_train.shape, by_train.shape, flush=True)
@@ -0,0 +1,59 @@
+import numpy as np
+import argparse
+import sys
+import meep as mp
+
+from nanophotonic_structures import constants
+from nanophotonic_structures.utils import utils_structures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--structure', type=str, default='nanospheres3d')
+    parser.add_argument('--ind_materials', type=int, default=0)
+    parser.add_argument('--fidelity', type=str, default='low')
+    parser.add_argument('--tolerance', type=float, default=constants.tolerance_symmetries)
+
+    args = parser.parse_args()
+
+    str_structure = args.structure
+    ind_materials = args.ind_materials
+    str_fidelity = args.fidelity
+    tolerance = args.tolerance
+
+    seed = 42
+
+    assert str_structure in [
+        'doublenanocones3d',
+        'nanocones3d',
+        'nanospheres3d',
+        'nanowires3d',
+        'threelayers3d',
+    ]
+    assert str_fidelity in ['low', 'medium', 'high']
+
+    target_class, depth_pml, size_mesh, materials = utils_structures.get_structure(
+        str_structure, ind_materials, str_fidelity)
+    bounds = utils_structures.get_bounds(str_structure)
+    grids = utils_structures.get_grids(str_structure, bounds)
+
+    # a single symmetric design is run on the full cell and on the reduced cell.
+    ind_design = np.random.RandomState(seed).choice(grids.shape[0])
+    variables = np.array(grids[ind_design])
+
+    obj = target_class(
+        depth_pml=depth_pml,
+        size_mesh=size_mesh,
+        mode='decay',
+        materials=materials,
+        use_symmetries=True,
+    )
+
+    _, errors, is_verified = obj.run_verification_symmetries(variables, tolerance=tolerance)
+
+    if mp.am_master():
+        print(f'{str_structure} size_mesh {size_mesh} variables {variables}', flush=True)
+        print(f'spectra with symmetries match the full cell within {tolerance}: {is_verified}', flush=True)
+
+    # a nonzero exit status marks a mismatch, so that the check can gate runs with symmetries.
+    sys.exit(0 if is_verified else 1)